@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-import hashlib
-import re
+import heapq
+import string
+from functools import lru_cache
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1.admin_schemas import (
     AdminSettings,
@@ -16,25 +19,42 @@ from app.api.v1.admin_schemas import (
     PromptTemplateSummary,
     PromptTemplateVersion,
 )
+from app.api.v1.responses import model_response
 from app.core.auth import verify_api_key
-from app.core.config import Settings, get_settings
+from app.core.config import Settings, get_request_settings
 from app.core.rbac import require_roles
 from app.db.store import OasisStore, get_store
-from app.services.llm_adapter import run_llm
+from app.services.llm_adapter import MODE_FORCE_MOCK, run_llm
 from app.services.prompt_engine import build_user_prompt
-from app.services.prompt_variants import get_system_prompt, list_prompt_variant_names, load_prompt_variants
+from app.services.prompt_variants import (
+    clear_prompt_variant_caches,
+    get_system_prompt,
+    get_system_prompt_sha256,
+    list_prompt_variant_names,
+    resolve_system_prompt,
+)
 
 router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(verify_api_key), Depends(require_roles("admin"))])
 
 
-_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,79}$")
+_NAME_CHARS = (string.ascii_letters + string.digits + "._-").encode("ascii")
+_NAME_MAX_LENGTH = 80
+_BUILTIN_CREATED_AT = "1970-01-01T00:00:00+00:00"
+
+
+def _is_valid_template_name(candidate: str) -> bool:
+    # Same rule as ^[A-Za-z0-9][A-Za-z0-9._-]{0,79}$, checked with a single C-level translate.
+    if not (0 < len(candidate) <= _NAME_MAX_LENGTH and candidate.isascii()):
+        return False
+    raw = candidate.encode("ascii")
+    return raw[:1].isalnum() and not raw.translate(None, _NAME_CHARS)
 
 
 def _validate_template_name(name: str) -> str:
     candidate = name.strip()
     if candidate == "default":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot overwrite 'default' prompt.")
-    if not _NAME_PATTERN.match(candidate):
+    if not _is_valid_template_name(candidate):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid template name. Use letters/numbers and . _ - (max 80 chars).",
@@ -42,26 +62,38 @@ def _validate_template_name(name: str) -> str:
     return candidate
 
 
+# Response models below are built with model_construct: every value comes from our own store,
+# the built-in prompt files or the settings object, so full validation is skipped on these read
+# paths. Client input is validated at ingress only (request bodies / RiskRequest payloads).
+@lru_cache(maxsize=512)
+def _cached_summary(
+    name: str,
+    source: str,
+    managed: bool,
+    current_version: int | None,
+    updated_at: str | None,
+) -> PromptTemplateSummary:
+    # Keyed on every field, so a template write yields a new key instead of a stale hit;
+    # instances are frozen, so sharing them across requests is safe.
+    return PromptTemplateSummary.model_construct(
+        name=name,
+        source=source,
+        managed=managed,
+        current_version=current_version,
+        updated_at=updated_at,
+    )
+
+
 def _to_summary(name: str, store_record: dict | None) -> PromptTemplateSummary:
     if store_record:
-        return PromptTemplateSummary.model_validate(
-            {
-                "name": name,
-                "source": "store",
-                "managed": True,
-                "current_version": store_record.get("current_version"),
-                "updated_at": store_record.get("updated_at"),
-            }
+        return _cached_summary(
+            name,
+            "store",
+            True,
+            store_record.get("current_version"),
+            store_record.get("updated_at"),
         )
-    return PromptTemplateSummary.model_validate(
-        {
-            "name": name,
-            "source": "builtin",
-            "managed": False,
-            "current_version": None,
-            "updated_at": None,
-        }
-    )
+    return _cached_summary(name, "builtin", False, None, None)
 
 
 def _build_detail(name: str, store: OasisStore) -> PromptTemplateDetail:
@@ -69,65 +101,58 @@ def _build_detail(name: str, store: OasisStore) -> PromptTemplateDetail:
     if store_record:
         versions = store_record.get("versions") or []
         latest = versions[-1] if versions else {}
-        return PromptTemplateDetail.model_validate(
-            {
-                "name": store_record.get("name"),
-                "source": "store",
-                "managed": True,
-                "current_version": store_record.get("current_version"),
-                "updated_at": store_record.get("updated_at"),
-                "content": latest.get("content") or "",
-                "versions": [
-                    PromptTemplateVersion.model_validate(
-                        {
-                            "version": v.get("version"),
-                            "created_at": v.get("created_at"),
-                            "sha256": v.get("sha256"),
-                            "notes": v.get("notes"),
-                        }
-                    )
-                    for v in versions
-                    if isinstance(v, dict)
-                ],
-            }
+        return PromptTemplateDetail.model_construct(
+            name=store_record.get("name"),
+            source="store",
+            managed=True,
+            current_version=store_record.get("current_version"),
+            updated_at=store_record.get("updated_at"),
+            content=latest.get("content") or "",
+            versions=[PromptTemplateVersion.model_construct(**v) for v in versions if isinstance(v, dict)],
         )
 
     content = get_system_prompt(name)
-    sha = hashlib.sha256(content.encode("utf-8")).hexdigest()
-    return PromptTemplateDetail.model_validate(
-        {
-            "name": name,
-            "source": "builtin",
-            "managed": False,
-            "content": content,
-            "versions": [
-                {
-                    "version": 1,
-                    "created_at": "1970-01-01T00:00:00+00:00",
-                    "sha256": sha,
-                    "notes": "Built-in (not versioned in store).",
-                }
-            ],
-        }
+    sha = get_system_prompt_sha256(name)
+    return PromptTemplateDetail.model_construct(
+        name=name,
+        source="builtin",
+        managed=False,
+        content=content,
+        versions=[
+            PromptTemplateVersion.model_construct(
+                version=1,
+                created_at=_BUILTIN_CREATED_AT,
+                sha256=sha,
+                notes="Built-in (not versioned in store).",
+            )
+        ],
     )
 
 
-@router.get("/prompt-templates", response_model=list[PromptTemplateSummary])
+@router.get(
+    "/prompt-templates",
+    response_model=None,
+    responses={200: {"model": list[PromptTemplateSummary]}},
+)
 def list_prompt_templates(
     store: OasisStore = Depends(get_store),
-) -> list[PromptTemplateSummary]:
-    store_templates = {t.get("name"): t for t in store.list_prompt_templates() if t.get("name")}
-    all_names = set(list_prompt_variant_names()) | set(store_templates.keys())
-    return [_to_summary(name, store_templates.get(name)) for name in sorted(all_names)]
+) -> ORJSONResponse:
+    store_templates = {t["name"]: t for t in store.list_prompt_templates() if t.get("name")}
+    # Both sources are already sorted, so a linear merge + dedup replaces set union + sort.
+    names: list[str] = []
+    for name in heapq.merge(list_prompt_variant_names(), sorted(store_templates)):
+        if not names or names[-1] != name:
+            names.append(name)
+    return model_response(_to_summary(name, store_templates.get(name)) for name in names)
 
 
-@router.get("/prompt-templates/{name}", response_model=PromptTemplateDetail)
+@router.get("/prompt-templates/{name}", response_model=None, responses={200: {"model": PromptTemplateDetail}})
 def get_prompt_template(
     name: str,
     store: OasisStore = Depends(get_store),
-) -> PromptTemplateDetail:
+) -> ORJSONResponse:
     try:
-        return _build_detail(name, store)
+        return model_response(_build_detail(name, store))
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
@@ -143,7 +168,7 @@ def create_prompt_template(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Template already exists.")
 
     store_record = store.upsert_prompt_template(name, content=body.content, notes=body.notes)
-    load_prompt_variants.cache_clear()
+    clear_prompt_variant_caches()
     return _build_detail(store_record.get("name") or name, store)
 
 
@@ -154,68 +179,76 @@ def update_prompt_template(
     store: OasisStore = Depends(get_store),
 ) -> PromptTemplateDetail:
     name = _validate_template_name(name)
-    if not store.get_prompt_template(name):
+    existing = store.get_prompt_template(name)
+    if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found.")
 
-    store.upsert_prompt_template(name, content=body.content, notes=body.notes)
-    load_prompt_variants.cache_clear()
+    updated = store.upsert_prompt_template(name, content=body.content, notes=body.notes)
+    if updated.get("current_version") != existing.get("current_version"):
+        clear_prompt_variant_caches()
     return _build_detail(name, store)
 
 
-@router.post("/prompt-templates/{name}/test-run", response_model=PromptTemplateTestRunResponse)
-def test_run_prompt_template(
+@router.post(
+    "/prompt-templates/{name}/test-run",
+    response_model=None,
+    responses={200: {"model": PromptTemplateTestRunResponse}},
+)
+async def test_run_prompt_template(
     name: str,
     body: PromptTemplateTestRunRequest,
-    settings: Settings = Depends(get_settings),
-) -> PromptTemplateTestRunResponse:
+    settings: Settings = Depends(get_request_settings),
+) -> ORJSONResponse:
     variant_name = name.strip() or "default"
-    system_prompt = get_system_prompt(variant_name)
-    system_prompt_sha256 = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    try:
+        # After a template write clears the variant caches this reloads files and the store,
+        # so it must not run on the event loop.
+        system_prompt, system_prompt_sha256 = await run_in_threadpool(resolve_system_prompt, variant_name)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    # Built once here and handed to run_llm, which would otherwise rebuild it for live calls.
     user_prompt = build_user_prompt(body.payload)
     system_prompt_override = None if variant_name == "default" else system_prompt
 
     mode = (body.mode or "mock").strip().lower()
-    force_mock = None
-    if mode == "mock":
-        force_mock = True
-    elif mode == "live":
-        force_mock = False
+    force_mock = MODE_FORCE_MOCK.get(mode)
 
-    response = run_llm(
+    response = await run_llm(
         body.payload,
         settings,
         force_mock=force_mock,
         llm_model_override=body.llm_model if mode == "live" else None,
         system_prompt_override=system_prompt_override,
+        user_prompt=user_prompt,
     )
-    return PromptTemplateTestRunResponse.model_validate(
-        {
-            "trace_id": response.trace_id,
-            "system_prompt_sha256": system_prompt_sha256,
-            "user_prompt": user_prompt,
-            "response": response,
-        }
+    return model_response(
+        PromptTemplateTestRunResponse.model_construct(
+            trace_id=response.trace_id,
+            system_prompt_sha256=system_prompt_sha256,
+            user_prompt=user_prompt,
+            response=response,
+        )
     )
 
 
-@router.get("/settings", response_model=AdminSettings)
+@router.get("/settings", response_model=None, responses={200: {"model": AdminSettings}})
 def get_admin_settings(
-    settings: Settings = Depends(get_settings),
-) -> AdminSettings:
-    return AdminSettings.model_validate(
-        {
-            "mock_mode": settings.mock_mode,
-            "llm_provider": settings.llm_provider,
-            "llm_model": settings.llm_model,
-            "allowed_origins": settings.allowed_origins,
-            "auth_mode": settings.auth_mode,
-            "app_api_key_configured": settings.app_api_key is not None,
-            "jwt_issuer": settings.jwt_issuer,
-            "jwt_audience": settings.jwt_audience,
-            "jwt_jwks_url": settings.jwt_jwks_url,
-            "jwt_roles_claim": settings.jwt_roles_claim,
-            "store_path": settings.store_path,
-        }
+    settings: Settings = Depends(get_request_settings),
+) -> ORJSONResponse:
+    return model_response(
+        AdminSettings.model_construct(
+            mock_mode=settings.mock_mode,
+            llm_provider=settings.llm_provider,
+            llm_model=settings.llm_model,
+            allowed_origins=settings.allowed_origins,
+            auth_mode=settings.auth_mode,
+            app_api_key_configured=settings.app_api_key is not None,
+            jwt_issuer=settings.jwt_issuer,
+            jwt_audience=settings.jwt_audience,
+            jwt_jwks_url=settings.jwt_jwks_url,
+            jwt_roles_claim=settings.jwt_roles_claim,
+            store_path=settings.store_path,
+        )
     )
 
 
@@ -223,10 +256,9 @@ def get_admin_settings(
 def get_audit_snapshot(
     limit: int = Query(default=50, ge=1, le=200),
     store: OasisStore = Depends(get_store),
-) -> AuditSnapshot:
-    return AuditSnapshot.model_validate(
-        {
-            "recent_versions": store.list_recent_versions(limit),
-            "recent_feedback": store.list_recent_feedback(limit),
-        }
-    )
+) -> dict:
+    # Store records are already plain JSON dicts, so checking them against the shallow list[dict] schema stays cheap.
+    return {
+        "recent_versions": store.list_recent_versions(limit),
+        "recent_feedback": store.list_recent_feedback(limit),
+    }
@@ -1,55 +1,67 @@
 from __future__ import annotations
 
-from datetime import datetime
-
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.api.v1.schemas import RiskRequest, RiskResponse
 
 
 class PromptTemplateUpsert(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     name: str = Field(..., min_length=1, max_length=80)
     content: str = Field(..., min_length=1, max_length=20000)
     notes: str | None = Field(default=None, max_length=2000)
 
 
 class PromptTemplateUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     content: str = Field(..., min_length=1, max_length=20000)
     notes: str | None = Field(default=None, max_length=2000)
 
 
 class PromptTemplateVersion(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     version: int
-    created_at: datetime
+    created_at: str = Field(..., description="ISO-8601 timestamp as stored.")
     sha256: str
     notes: str | None = None
 
 
 class PromptTemplateSummary(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     source: str = Field(..., description="builtin|store")
     managed: bool
     current_version: int | None = None
-    updated_at: datetime | None = None
+    updated_at: str | None = None
 
 
 class PromptTemplateDetail(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     source: str
     managed: bool
     current_version: int | None = None
-    updated_at: datetime | None = None
+    updated_at: str | None = None
     content: str
     versions: list[PromptTemplateVersion] = Field(default_factory=list)
 
 
 class PromptTemplateTestRunRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     payload: RiskRequest
     mode: str | None = Field(default="mock", description="mock|live|auto")
     llm_model: str | None = None
 
 
 class PromptTemplateTestRunResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     trace_id: str
     system_prompt_sha256: str
     user_prompt: str
@@ -57,6 +69,8 @@ class PromptTemplateTestRunResponse(BaseModel):
 
 
 class AdminSettings(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     mock_mode: bool
     llm_provider: str
     llm_model: str
@@ -71,6 +85,8 @@ class AdminSettings(BaseModel):
 
 
 class AuditSnapshot(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     recent_versions: list[dict]
     recent_feedback: list[dict]
 
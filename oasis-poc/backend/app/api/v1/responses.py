@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def model_response(content: BaseModel | Iterable[BaseModel], status_code: int = 200) -> ORJSONResponse:
+    """
+    Serialize models we built ourselves straight to JSON, skipping FastAPI's response_model pass.
+    """
+    if isinstance(content, BaseModel):
+        data = content.model_dump(mode="json")
+    else:
+        data = [item.model_dump(mode="json") for item in content]
+    return ORJSONResponse(content=data, status_code=status_code)
@@ -1,6 +1,6 @@
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 Likelihood = Literal["Low", "Medium", "High"]
@@ -21,6 +21,8 @@ PublicSourceType = Literal[
 
 
 class PublicReference(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     source_type: PublicSourceType
     title: str
     identifier: Optional[str] = None
@@ -29,6 +31,8 @@ class PublicReference(BaseModel):
 
 
 class ControlFrameworkMapping(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     control_statement: str
     framework: str = Field(
         ...,
@@ -52,6 +56,8 @@ VulnerabilityType = Literal["CVE", "OWASP", "INCIDENT_REPORT", "DATASET", "OTHER
 
 
 class VulnerabilitySummary(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     vulnerability_type: VulnerabilityType
     identifier: Optional[str] = Field(
         default=None,
@@ -70,6 +76,9 @@ class VulnerabilitySummary(BaseModel):
 
 
 class RiskRequest(BaseModel):
+    # Client ingress: reject unknown fields instead of silently dropping them.
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     business_type: str = Field(..., json_schema_extra={"example": "Retail banking"})
     risk_domain: str = Field(..., json_schema_extra={"example": "Operational"})
     scope: Optional[str] = Field(
@@ -127,7 +136,15 @@ class RiskRequest(BaseModel):
     )
 
 
+class StoredRiskRequest(RiskRequest):
+    # Stored payloads echoed back in responses: keys from older records are dropped instead of
+    # failing validation, so forbid stays an ingress-only rule.
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+
 class RiskItem(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     risk_id: str = Field(..., json_schema_extra={"example": "R1"})
     risk_title: str = Field(..., json_schema_extra={"example": "Third-party outage"})
     cause: str
@@ -144,6 +161,30 @@ class RiskItem(BaseModel):
     due_date: Optional[str] = None
     assumptions: List[str] = Field(default_factory=list)
 
+    @field_validator("risk_id", mode="before")
+    @classmethod
+    def coerce_risk_id(cls, value: object) -> object:
+        """
+        Accept non-string ids from model output (e.g. 1 instead of "R1").
+        """
+        return value if isinstance(value, str) else str(value)
+
+    @field_validator(
+        "controls",
+        "control_mappings",
+        "mitigations",
+        "kpis",
+        "vulnerability_summaries",
+        "assumptions",
+        mode="before",
+    )
+    @classmethod
+    def null_list_to_empty(cls, value: object) -> object:
+        """
+        Treat an explicit null list from model output as empty.
+        """
+        return [] if value is None else value
+
 
 class RiskResponse(BaseModel):
     trace_id: str
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import logging
 import re
+from collections import OrderedDict
+from threading import Lock
 from typing import Literal
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 
 from app.api.v1.schemas import RiskRequest
 from app.api.v1.workflow_schemas import (
@@ -21,105 +24,128 @@ from app.api.v1.workflow_schemas import (
     ProjectCreate,
 )
 from app.core.auth import verify_api_key
-from app.core.config import Settings, get_settings
-from app.core.data_policy import find_private_indicators
+from app.core.config import Settings, get_request_settings
+from app.core.data_policy import find_private_indicators, policy_values
 from app.core.rbac import UserPrincipal, require_roles
 from app.db.store import OasisStore, get_store
-from app.services.llm_adapter import run_llm
+from app.services.llm_adapter import MODE_FORCE_MOCK, run_llm
 from app.services.prompt_engine import build_user_prompt
-from app.services.prompt_variants import get_system_prompt
+from app.services.prompt_variants import resolve_system_prompt
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["workflow"], dependencies=[Depends(verify_api_key)])
 
+_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+# Every store call runs on the threadpool: writes append to the log, and reads take the
+# store lock and may reload the snapshot + log from disk after another process wrote to it.
+#
+# Endpoints return OasisStore records as plain dicts. The store only holds data that was
+# validated on the way in, so the route's response_model is the single validation/serialization
+# pass instead of model_validate in the handler followed by FastAPI revalidating the result.
+
+
+# digest of the policy field values -> marker hits. Only digests and marker names are kept, never
+# the submitted text, so inputs the guard rejected do not linger in process memory.
+_POLICY_HITS_CACHE: OrderedDict[bytes, tuple[str, ...]] = OrderedDict()
+_POLICY_HITS_CACHE_LOCK = Lock()
+_POLICY_HITS_CACHE_MAXSIZE = 1024
+
+
+def _policy_values_digest(values: tuple[str, ...]) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        raw = value.encode("utf-8")
+        digest.update(len(raw).to_bytes(8, "little"))
+        digest.update(raw)
+    return digest.digest()
+
 
 def _policy_hits_from_risk_request(payload: RiskRequest) -> list[str]:
-    return find_private_indicators(
-        [
-            payload.business_type,
-            payload.risk_domain,
-            payload.scope,
-            payload.time_horizon,
-            " ".join(payload.known_controls) if payload.known_controls else None,
-            payload.verbosity,
-            payload.language,
-            payload.region,
-            payload.size,
-            payload.maturity,
-            payload.objectives,
-            payload.context,
-            payload.constraints,
-            payload.requested_outputs,
-            payload.refinements,
-            " ".join(payload.control_tokens) if payload.control_tokens else None,
-            payload.instruction_tuning,
-        ]
-    )
+    values = policy_values(payload)
+    if not values:
+        return []
+    # Re-running an unchanged payload skips the scan.
+    key = _policy_values_digest(values)
+    with _POLICY_HITS_CACHE_LOCK:
+        hits = _POLICY_HITS_CACHE.get(key)
+        if hits is not None:
+            _POLICY_HITS_CACHE.move_to_end(key)
+            return list(hits)
+    hits = tuple(find_private_indicators(values))
+    with _POLICY_HITS_CACHE_LOCK:
+        _POLICY_HITS_CACHE[key] = hits
+        while len(_POLICY_HITS_CACHE) > _POLICY_HITS_CACHE_MAXSIZE:
+            _POLICY_HITS_CACHE.popitem(last=False)
+    return list(hits)
 
 
 @router.get("/projects", response_model=list[Project])
-def list_projects(
+async def list_projects(
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst", "reviewer")),
-) -> list[Project]:
-    return [Project.model_validate(p) for p in store.list_projects()]
+) -> list[dict]:
+    return await run_in_threadpool(store.list_projects)
 
 
 @router.post("/projects", response_model=Project, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     body: ProjectCreate,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst")),
-) -> Project:
-    record = store.create_project(name=body.name, description=body.description)
-    return Project.model_validate(record)
+) -> dict:
+    record = await run_in_threadpool(store.create_project, name=body.name, description=body.description)
+    return record
 
 
 @router.get("/projects/{project_id}", response_model=Project)
-def get_project(
+async def get_project(
     project_id: str,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst", "reviewer")),
-) -> Project:
-    record = store.get_project(project_id)
+) -> dict:
+    record = await run_in_threadpool(store.get_project, project_id)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
-    return Project.model_validate(record)
+    return record
 
 
 @router.get("/projects/{project_id}/assessments", response_model=list[AssessmentSummary])
-def list_assessments(
+async def list_assessments(
     project_id: str,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst", "reviewer")),
-) -> list[AssessmentSummary]:
-    if not store.get_project(project_id):
+) -> list[dict]:
+    try:
+        assessments = await run_in_threadpool(store.list_assessments, project_id)
+    except KeyError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
-
-    summaries: list[AssessmentSummary] = []
-    for assessment in store.list_assessments(project_id):
+    latest_versions = await run_in_threadpool(
+        store.get_versions_bulk,
+        [a["latest_version_id"] for a in assessments if a.get("latest_version_id")],
+    )
+    summaries: list[dict] = []
+    for assessment in assessments:
         latest_version_id = assessment.get("latest_version_id")
         latest_version_number: int | None = None
         latest_trace_id: str | None = None
         if latest_version_id:
-            version = store.get_version(latest_version_id) or {}
+            version = latest_versions.get(latest_version_id) or {}
             latest_version_number = int(version.get("version_number") or 0) or None
             latest_trace_id = version.get("trace_id")
         summaries.append(
-            AssessmentSummary.model_validate(
-                {
-                    "assessment_id": assessment.get("assessment_id"),
-                    "project_id": assessment.get("project_id"),
-                    "title": assessment.get("title"),
-                    "template_id": assessment.get("template_id"),
-                    "updated_at": assessment.get("updated_at"),
-                    "latest_version_id": latest_version_id,
-                    "latest_version_number": latest_version_number,
-                    "latest_trace_id": latest_trace_id,
-                }
-            )
+            {
+                "assessment_id": assessment.get("assessment_id"),
+                "project_id": assessment.get("project_id"),
+                "title": assessment.get("title"),
+                "template_id": assessment.get("template_id"),
+                "updated_at": assessment.get("updated_at"),
+                "latest_version_id": latest_version_id,
+                "latest_version_number": latest_version_number,
+                "latest_trace_id": latest_trace_id,
+            }
         )
     return summaries
 
@@ -129,15 +155,12 @@ def list_assessments(
     response_model=Assessment,
     status_code=status.HTTP_201_CREATED,
 )
-def create_assessment(
+async def create_assessment(
     project_id: str,
     body: AssessmentCreate,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst")),
-) -> Assessment:
-    if not store.get_project(project_id):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
-
+) -> dict:
     policy_hits = _policy_hits_from_risk_request(body.payload)
     if policy_hits:
         raise HTTPException(
@@ -149,7 +172,8 @@ def create_assessment(
         )
 
     try:
-        record = store.create_assessment(
+        record = await run_in_threadpool(
+            store.create_assessment,
             project_id=project_id,
             title=body.title,
             template_id=body.template_id,
@@ -157,42 +181,41 @@ def create_assessment(
         )
     except KeyError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
-    return Assessment.model_validate(record)
+    return record
 
 
 @router.get("/assessments/{assessment_id}", response_model=Assessment)
-def get_assessment(
+async def get_assessment(
     assessment_id: str,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst", "reviewer")),
-) -> Assessment:
-    record = store.get_assessment(assessment_id)
+) -> dict:
+    record = await run_in_threadpool(store.get_assessment, assessment_id)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assessment not found.")
-    return Assessment.model_validate(record)
+    return record
 
 
 @router.get("/assessments/{assessment_id}/versions", response_model=list[AssessmentVersionSummary])
-def list_versions(
+async def list_versions(
     assessment_id: str,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst", "reviewer")),
-) -> list[AssessmentVersionSummary]:
+) -> list[dict]:
     try:
-        versions = store.list_versions(assessment_id)
+        return await run_in_threadpool(store.list_versions, assessment_id)
     except KeyError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assessment not found.")
-    return [AssessmentVersionSummary.model_validate(v) for v in versions]
 
 
 @router.get("/assessments/{assessment_id}/versions/{version_id}", response_model=AssessmentVersion)
-def get_version(
+async def get_version(
     assessment_id: str,
     version_id: str,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst", "reviewer")),
-) -> AssessmentVersion:
-    record = store.get_version(version_id)
+) -> dict:
+    record = await run_in_threadpool(store.get_version, version_id)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found.")
     if record.get("assessment_id") != assessment_id:
@@ -201,11 +224,11 @@ def get_version(
             assessment_id,
             record.get("assessment_id"),
         )
-    return AssessmentVersion.model_validate(record)
+    return record
 
 
 @router.post("/assessments/{assessment_id}/run", response_model=AssessmentVersion)
-def run_assessment(
+async def run_assessment(
     assessment_id: str,
     payload: RiskRequest,
     mode: Literal["auto", "mock", "live"] = Query("auto"),
@@ -215,11 +238,11 @@ def run_assessment(
         default=None,
         description="PoC placeholder. When true, indicates RAG would be used for public references.",
     ),
-    settings: Settings = Depends(get_settings),
+    settings: Settings = Depends(get_request_settings),
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst")),
-) -> AssessmentVersion:
-    assessment = store.get_assessment(assessment_id)
+) -> dict:
+    assessment = await run_in_threadpool(store.get_assessment, assessment_id)
     if not assessment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assessment not found.")
 
@@ -233,11 +256,7 @@ def run_assessment(
             ),
         )
 
-    force_mock: bool | None = None
-    if mode == "mock":
-        force_mock = True
-    elif mode == "live":
-        force_mock = False
+    force_mock = MODE_FORCE_MOCK[mode]
     use_mock = settings.mock_mode if force_mock is None else force_mock
     resolved_mode: Literal["mock", "live"] = "mock" if use_mock else "live"
     model_override = llm_model if mode == "live" else None
@@ -245,20 +264,20 @@ def run_assessment(
 
     variant_name = (prompt_variant or "default").strip() or "default"
     try:
-        system_prompt = get_system_prompt(variant_name)
+        system_prompt, system_prompt_sha256 = await run_in_threadpool(resolve_system_prompt, variant_name)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    system_prompt_sha256 = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
     user_prompt = build_user_prompt(payload)
     system_prompt_override = None if variant_name == "default" else system_prompt
 
     try:
-        response = run_llm(
+        response = await run_llm(
             payload,
             settings,
             force_mock=force_mock,
             llm_model_override=model_override,
             system_prompt_override=system_prompt_override,
+            user_prompt=user_prompt,
         )
     except HTTPException:
         raise
@@ -269,7 +288,8 @@ def run_assessment(
             detail="Assessment run failed. Check backend logs for details.",
         ) from exc
 
-    record = store.create_version(
+    record = await run_in_threadpool(
+        store.create_version,
         assessment_id=assessment_id,
         request_payload=payload.model_dump(exclude_none=True),
         response_payload=response.model_dump(exclude_none=True),
@@ -283,7 +303,7 @@ def run_assessment(
         user_prompt=user_prompt,
         rag_enabled=rag_enabled if rag_enabled is not None else payload.rag_enabled,
     )
-    return AssessmentVersion.model_validate(record)
+    return record
 
 
 @router.post(
@@ -291,15 +311,16 @@ def run_assessment(
     response_model=Feedback,
     status_code=status.HTTP_201_CREATED,
 )
-def create_feedback(
+async def create_feedback(
     assessment_id: str,
     version_id: str,
     body: FeedbackCreate,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("reviewer")),
-) -> Feedback:
+) -> dict:
     try:
-        record = store.create_feedback(
+        record = await run_in_threadpool(
+            store.create_feedback,
             assessment_id,
             version_id,
             rating=body.rating,
@@ -310,191 +331,188 @@ def create_feedback(
         )
     except KeyError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found.")
-    return Feedback.model_validate(record)
+    return record
 
 
 @router.get("/assessments/{assessment_id}/versions/{version_id}/feedback", response_model=list[Feedback])
-def list_feedback(
+async def list_feedback(
     assessment_id: str,
     version_id: str,
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst", "reviewer")),
-) -> list[Feedback]:
+) -> list[dict]:
     try:
-        items = store.list_feedback(assessment_id, version_id)
+        return await run_in_threadpool(store.list_feedback, assessment_id, version_id)
     except KeyError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found.")
-    return [Feedback.model_validate(item) for item in items]
 
 
 def _safe_filename(value: str) -> str:
     value = value.strip() or "export"
-    value = re.sub(r"[^A-Za-z0-9._-]+", "_", value)
+    value = _FILENAME_RE.sub("_", value)
     return value[:80].strip("_") or "export"
 
 
+def _md_bullets(items: list | None) -> str:
+    return "".join(f"- {item}\n" for item in items or ())
+
+
+def _md_refs(refs: list | None) -> str:
+    if not refs:
+        return ""
+    return "  - Refs: " + " | ".join(f"{r.get('source_type')}: {r.get('title')}" for r in refs) + "\n"
+
+
+def _md_mapping(mapping: dict) -> str:
+    framework = mapping.get("framework") or ""
+    cid = mapping.get("framework_control_id") or ""
+    name = mapping.get("framework_control_name") or ""
+    header = f"- {framework} {cid}".strip()
+    if name:
+        header = f"{header} - {name}"
+    statement = mapping.get("control_statement")
+    statement_line = f"  - {statement}\n" if statement else ""
+    return f"{header}\n{statement_line}{_md_refs(mapping.get('references'))}"
+
+
+def _md_vulnerability(vuln: dict) -> str:
+    vtype = vuln.get("vulnerability_type") or ""
+    vid = vuln.get("identifier") or ""
+    vtitle = vuln.get("title") or ""
+    severity = vuln.get("severity") or ""
+    label = f"- {vtype} {vid}".strip()
+    if vtitle:
+        label = f"{label}: {vtitle}" if label else vtitle
+    summary = vuln.get("summary")
+    summary_line = f"  - {summary}\n" if summary else ""
+    return f"{label} ({severity})".strip() + f"\n{summary_line}{_md_refs(vuln.get('references'))}"
+
+
+def _md_risk(risk: dict) -> str:
+    rid = risk.get("risk_id") or ""
+    title = risk.get("risk_title") or ""
+    cause = risk.get("cause")
+    impact = risk.get("impact")
+    heading = f"### {rid}: {title}".strip()
+    cause_line = f"- Cause: {cause}\n" if cause else ""
+    impact_line = f"- Impact: {impact}\n" if impact else ""
+    mappings = "".join(map(_md_mapping, risk.get("control_mappings") or ()))
+    vulnerabilities = "".join(map(_md_vulnerability, risk.get("vulnerability_summaries") or ()))
+    return (
+        f"{heading}\n\n"
+        f"- Likelihood: {risk.get('likelihood')}\n"
+        f"- Inherent: {risk.get('inherent_rating')}\n"
+        f"- Residual: {risk.get('residual_rating')}\n"
+        f"{cause_line}{impact_line}\n"
+        f"**Controls**\n{_md_bullets(risk.get('controls'))}\n"
+        f"**Mitigations**\n{_md_bullets(risk.get('mitigations'))}\n"
+        f"**KPIs**\n{_md_bullets(risk.get('kpis'))}\n"
+        f"**Control mappings**\n{mappings}\n"
+        f"**Vulnerability summaries**\n{vulnerabilities}\n"
+    )
+
+
 def _markdown_export(assessment_title: str, version: dict) -> str:
     response = version.get("response") or {}
     risks = response.get("risks") or []
-    lines: list[str] = []
-    lines.append(f"# {assessment_title} (v{version.get('version_number')})")
-    lines.append("")
-    lines.append(f"- Generated: {version.get('created_at')}")
-    lines.append(f"- Trace ID: {version.get('trace_id')}")
-    lines.append(f"- Mode: {version.get('resolved_mode')} (requested: {version.get('mode')})")
-    lines.append(f"- Model: {version.get('llm_model')}")
-    lines.append(f"- Prompt variant: {version.get('prompt_variant')}")
-    lines.append("")
-    lines.append("## Summary")
-    lines.append("")
-    lines.append(str(response.get("summary") or "").strip())
-    lines.append("")
-    lines.append("## Assumptions & Gaps")
-    lines.append("")
-    for gap in response.get("assumptions_gaps") or []:
-        lines.append(f"- {gap}")
-    if not (response.get("assumptions_gaps") or []):
-        lines.append("- (none)")
-    lines.append("")
-    lines.append("## Risks")
-    lines.append("")
-    for risk in risks:
-        rid = risk.get("risk_id") or ""
-        title = risk.get("risk_title") or ""
-        lines.append(f"### {rid}: {title}".strip())
-        lines.append("")
-        lines.append(f"- Likelihood: {risk.get('likelihood')}")
-        lines.append(f"- Inherent: {risk.get('inherent_rating')}")
-        lines.append(f"- Residual: {risk.get('residual_rating')}")
-        if risk.get("cause"):
-            lines.append(f"- Cause: {risk.get('cause')}")
-        if risk.get("impact"):
-            lines.append(f"- Impact: {risk.get('impact')}")
-        lines.append("")
-        lines.append("**Controls**")
-        for item in risk.get("controls") or []:
-            lines.append(f"- {item}")
-        lines.append("")
-        lines.append("**Mitigations**")
-        for item in risk.get("mitigations") or []:
-            lines.append(f"- {item}")
-        lines.append("")
-        lines.append("**KPIs**")
-        for item in risk.get("kpis") or []:
-            lines.append(f"- {item}")
-        lines.append("")
-        lines.append("**Control mappings**")
-        for mapping in risk.get("control_mappings") or []:
-            framework = mapping.get("framework") or ""
-            cid = mapping.get("framework_control_id") or ""
-            name = mapping.get("framework_control_name") or ""
-            header = f"- {framework} {cid}".strip()
-            if name:
-                header = f"{header} - {name}"
-            lines.append(header)
-            statement = mapping.get("control_statement")
-            if statement:
-                lines.append(f"  - {statement}")
-            refs = mapping.get("references") or []
-            if refs:
-                lines.append("  - Refs: " + " | ".join(f"{r.get('source_type')}: {r.get('title')}" for r in refs))
-        lines.append("")
-        lines.append("**Vulnerability summaries**")
-        for vuln in risk.get("vulnerability_summaries") or []:
-            vtype = vuln.get("vulnerability_type") or ""
-            vid = vuln.get("identifier") or ""
-            vtitle = vuln.get("title") or ""
-            severity = vuln.get("severity") or ""
-            label = f"- {vtype} {vid}".strip()
-            if vtitle:
-                label = f"{label}: {vtitle}" if label else vtitle
-            lines.append(f"{label} ({severity})".strip())
-            summary = vuln.get("summary")
-            if summary:
-                lines.append(f"  - {summary}")
-            refs = vuln.get("references") or []
-            if refs:
-                lines.append("  - Refs: " + " | ".join(f"{r.get('source_type')}: {r.get('title')}" for r in refs))
-        lines.append("")
-    return "\n".join(lines).strip() + "\n"
+    gaps = response.get("assumptions_gaps") or []
+    summary = str(response.get("summary") or "").strip()
+    gap_lines = _md_bullets(gaps) or "- (none)\n"
+    header = (
+        f"# {assessment_title} (v{version.get('version_number')})\n\n"
+        f"- Generated: {version.get('created_at')}\n"
+        f"- Trace ID: {version.get('trace_id')}\n"
+        f"- Mode: {version.get('resolved_mode')} (requested: {version.get('mode')})\n"
+        f"- Model: {version.get('llm_model')}\n"
+        f"- Prompt variant: {version.get('prompt_variant')}\n\n"
+        f"## Summary\n\n{summary}\n\n"
+        f"## Assumptions & Gaps\n\n{gap_lines}\n"
+        "## Risks\n\n"
+    )
+    body = "".join(map(_md_risk, risks))
+    return (header + body).strip() + "\n"
+
+
+# export format -> (media type, file extension)
+_EXPORT_FORMATS = {
+    "json": ("application/json", "json"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "markdown": ("text/markdown; charset=utf-8", "md"),
+}
+
+_CSV_SPECIAL = frozenset(",\"\n")
 
 
 def _csv_escape(value: str) -> str:
-    if any(ch in value for ch in [",", "\"", "\n"]):
-        return '"' + value.replace('"', '""') + '"'
-    return value
+    if _CSV_SPECIAL.isdisjoint(value):
+        return value
+    return '"' + value.replace('"', '""') + '"'
+
+
+_CSV_HEADERS = (
+    "risk_id",
+    "risk_title",
+    "cause",
+    "impact",
+    "likelihood",
+    "inherent_rating",
+    "residual_rating",
+    "controls",
+    "mitigations",
+    "kpis",
+    "assumptions",
+)
 
 
 def _csv_export(version: dict) -> str:
     response = version.get("response") or {}
     rows = response.get("risks") or []
-    headers = [
-        "risk_id",
-        "risk_title",
-        "cause",
-        "impact",
-        "likelihood",
-        "inherent_rating",
-        "residual_rating",
-        "controls",
-        "mitigations",
-        "kpis",
-        "assumptions",
-    ]
-    out_lines = [",".join(headers)]
+    out_lines = [",".join(_CSV_HEADERS)]
     for risk in rows:
-        row = {
-            "risk_id": str(risk.get("risk_id") or ""),
-            "risk_title": str(risk.get("risk_title") or ""),
-            "cause": str(risk.get("cause") or ""),
-            "impact": str(risk.get("impact") or ""),
-            "likelihood": str(risk.get("likelihood") or ""),
-            "inherent_rating": str(risk.get("inherent_rating") or ""),
-            "residual_rating": str(risk.get("residual_rating") or ""),
-            "controls": "; ".join(risk.get("controls") or []),
-            "mitigations": "; ".join(risk.get("mitigations") or []),
-            "kpis": "; ".join(risk.get("kpis") or []),
-            "assumptions": "; ".join(risk.get("assumptions") or []),
-        }
-        out_lines.append(",".join(_csv_escape(row[h]) for h in headers))
+        fields = (
+            str(risk.get("risk_id") or ""),
+            str(risk.get("risk_title") or ""),
+            str(risk.get("cause") or ""),
+            str(risk.get("impact") or ""),
+            str(risk.get("likelihood") or ""),
+            str(risk.get("inherent_rating") or ""),
+            str(risk.get("residual_rating") or ""),
+            "; ".join(risk.get("controls") or []),
+            "; ".join(risk.get("mitigations") or []),
+            "; ".join(risk.get("kpis") or []),
+            "; ".join(risk.get("assumptions") or []),
+        )
+        out_lines.append(",".join(map(_csv_escape, fields)))
     return "\n".join(out_lines).strip() + "\n"
 
 
 @router.get("/assessments/{assessment_id}/versions/{version_id}/export")
-def export_version(
+async def export_version(
     assessment_id: str,
     version_id: str,
     format: Literal["markdown", "csv", "json"] = Query("markdown"),
     store: OasisStore = Depends(get_store),
     _: UserPrincipal = Depends(require_roles("analyst", "reviewer")),
 ) -> Response:
-    assessment = store.get_assessment(assessment_id)
+    assessment = await run_in_threadpool(store.get_assessment, assessment_id)
     if not assessment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assessment not found.")
 
-    version = store.get_version(version_id)
+    version = await run_in_threadpool(store.get_version, version_id)
     if not version or version.get("assessment_id") != assessment_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found.")
 
     title = assessment.get("title") or "assessment"
     base = _safe_filename(f"{title}_v{version.get('version_number')}")
     if format == "json":
-        payload = json.dumps(version.get("response") or {}, ensure_ascii=False, indent=2)
-        return Response(
-            content=payload,
-            media_type="application/json",
-            headers={"Content-Disposition": f'attachment; filename="{base}.json"'},
-        )
-    if format == "csv":
-        payload = _csv_export(version)
-        return Response(
-            content=payload,
-            media_type="text/csv; charset=utf-8",
-            headers={"Content-Disposition": f'attachment; filename="{base}.csv"'},
-        )
-    payload = _markdown_export(title, version)
+        content: str | bytes = orjson.dumps(version.get("response") or {}, option=orjson.OPT_INDENT_2)
+    elif format == "csv":
+        content = _csv_export(version)
+    else:
+        content = _markdown_export(title, version)
+    media_type, extension = _EXPORT_FORMATS[format]
     return Response(
-        content=payload,
-        media_type="text/markdown; charset=utf-8",
-        headers={"Content-Disposition": f'attachment; filename="{base}.md"'},
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{base}.{extension}"'},
     )
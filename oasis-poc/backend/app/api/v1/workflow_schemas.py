@@ -5,7 +5,7 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
-from app.api.v1.schemas import RiskRequest, RiskResponse
+from app.api.v1.schemas import RiskRequest, RiskResponse, StoredRiskRequest
 
 
 class ProjectCreate(BaseModel):
@@ -35,7 +35,7 @@ class Assessment(BaseModel):
     created_at: datetime
     updated_at: datetime
     latest_version_id: str | None = None
-    payload: RiskRequest
+    payload: StoredRiskRequest
 
 
 class AssessmentSummary(BaseModel):
@@ -77,7 +77,7 @@ class AssessmentVersion(BaseModel):
     system_prompt_sha256: str
     user_prompt: str
     rag_enabled: bool | None = None
-    request: RiskRequest
+    request: StoredRiskRequest
     response: RiskResponse
 
 
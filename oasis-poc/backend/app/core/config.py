@@ -1,11 +1,38 @@
 import json
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import Literal, Optional
 
+from fastapi import Request
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+def _parse_list_setting(value: object, default: tuple[str, ...]) -> list[str] | object:
+    """
+    Parse a list-valued env setting given as a JSON array or a comma-separated string.
+    Blank input falls back to default; non-string values pass through to pydantic.
+    """
+    if value is None:
+        return list(default)
+    if not isinstance(value, str):
+        return value
+
+    stripped = value.strip()
+    if not stripped:
+        return list(default)
+
+    # Only a JSON array is accepted, so plain CSV input skips the parse attempt.
+    if stripped.startswith("["):
+        try:
+            parsed = json.loads(stripped)
+            if isinstance(parsed, list):
+                return parsed
+        except ValueError:
+            pass
+
+    return [item for item in (v.strip() for v in stripped.split(",")) if item]
+
+
 class Settings(BaseSettings):
     project_name: str = "oasis-poc-backend"
     api_v1_prefix: str = "/api/v1"
@@ -15,6 +42,13 @@ class Settings(BaseSettings):
     openai_api_key: Optional[str] = Field(default=None, validation_alias="OPENAI_API_KEY")
     app_api_key: Optional[str] = Field(default=None, validation_alias="APP_API_KEY")
     store_path: str = Field(default="oasis_store.json", validation_alias="OASIS_STORE_PATH")
+    # Seconds to reuse a live LLM response for an identical prompt + model; 0 disables the cache.
+    llm_cache_ttl_seconds: int = Field(default=0, ge=0, validation_alias="OASIS_LLM_CACHE_TTL_SECONDS")
+    # Reuse a live response for a near-duplicate prompt (embedding cosine >= threshold); off by default.
+    semantic_cache_enabled: bool = Field(default=False, validation_alias="OASIS_SEMANTIC_CACHE_ENABLED")
+    semantic_cache_threshold: float = Field(
+        default=0.92, ge=0.0, le=1.0, validation_alias="OASIS_SEMANTIC_CACHE_THRESHOLD"
+    )
 
     auth_mode: Literal["disabled", "api_key", "jwt"] = Field(default="disabled", validation_alias="OASIS_AUTH_MODE")
     default_roles: list[str] = Field(default_factory=lambda: ["analyst"], validation_alias="OASIS_DEFAULT_ROLES")
@@ -44,27 +78,7 @@ class Settings(BaseSettings):
         """
         Accept plain strings (e.g. "*" or comma-separated URLs) in addition to JSON lists.
         """
-        if value is None or value == "":
-            return ["*"]
-
-        if isinstance(value, str):
-            stripped = value.strip()
-            if not stripped:
-                return ["*"]
-
-            try:
-                parsed = json.loads(stripped)
-                if isinstance(parsed, list):
-                    return parsed
-            except ValueError:
-                pass
-
-            if stripped == "*":
-                return ["*"]
-
-            return [item for item in (v.strip() for v in stripped.split(",")) if item]
-
-        return value
+        return _parse_list_setting(value, default=("*",))
 
     @field_validator("default_roles", mode="before")
     @classmethod
@@ -72,22 +86,26 @@ class Settings(BaseSettings):
         """
         Accept comma-separated strings or JSON arrays for default roles.
         """
-        if value is None or value == "":
-            return ["analyst"]
+        return _parse_list_setting(value, default=("analyst",))
 
-        if isinstance(value, str):
-            stripped = value.strip()
-            if not stripped:
-                return ["analyst"]
-            try:
-                parsed = json.loads(stripped)
-                if isinstance(parsed, list):
-                    return parsed
-            except ValueError:
-                pass
-            return [item for item in (v.strip() for v in stripped.split(",")) if item]
+    @cached_property
+    def app_api_key_bytes(self) -> bytes | None:
+        """
+        UTF-8 encoded app_api_key, computed once for constant-time comparisons.
+        """
+        return self.app_api_key.encode("utf-8") if self.app_api_key is not None else None
 
-        return value
+    @cached_property
+    def jwt_algorithms(self) -> frozenset[str]:
+        """
+        JWT algorithms this deployment can verify: HS256 needs a shared secret, RS256 a JWKS source.
+        """
+        algorithms: set[str] = set()
+        if self.jwt_secret:
+            algorithms.add("HS256")
+        if self.jwt_jwks_url or self.jwt_issuer:
+            algorithms.add("RS256")
+        return frozenset(algorithms)
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -99,3 +117,12 @@ class Settings(BaseSettings):
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
+
+
+async def get_request_settings(request: Request) -> Settings:
+    """
+    Per-request settings dependency: reads the instance create_app() stored on app.state
+    instead of resolving the cached get_settings() on the threadpool for every request.
+    """
+    settings = getattr(request.app.state, "settings", None)
+    return settings if settings is not None else get_settings()
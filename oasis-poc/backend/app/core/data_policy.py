@@ -2,10 +2,20 @@
 Data policy helpers to keep PoC inputs to public/anonymized data only.
 """
 
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
 from collections.abc import Iterable
+from operator import attrgetter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.api.v1.schemas import RiskRequest
 
 # Lightweight keyword heuristics; this is a guardrail, not content inspection.
-PRIVATE_MARKERS = {
+# Immutable because the lookup tables below are derived from it once at import.
+PRIVATE_MARKERS = frozenset({
     "customer data",
     "client data",
     "pii",
@@ -23,44 +33,99 @@ PRIVATE_MARKERS = {
     "personally identifiable",
     "credit card",
     "account number",
-}
+})
+
+
+# RiskRequest fields screened by the policy check; list fields are joined into one string each.
+_POLICY_TEXT_FIELDS = attrgetter(
+    "business_type",
+    "risk_domain",
+    "scope",
+    "time_horizon",
+    "verbosity",
+    "language",
+    "region",
+    "size",
+    "maturity",
+    "objectives",
+    "context",
+    "constraints",
+    "requested_outputs",
+    "refinements",
+    "instruction_tuning",
+)
+_POLICY_LIST_FIELDS = attrgetter("known_controls", "control_tokens")
+
+
+def policy_values(payload: RiskRequest) -> tuple[str, ...]:
+    """
+    Collect the non-empty user-supplied text of a RiskRequest for find_private_indicators.
+    """
+    joined = (" ".join(items or ()) for items in _POLICY_LIST_FIELDS(payload))
+    return tuple(value for value in (*_POLICY_TEXT_FIELDS(payload), *joined) if value)
+
+
+_NEGATION_TOKENS = ("no", "not", "without", "avoid")
+_NEGATION_WINDOW = 3
+_TOKEN_RE = re.compile(r"\S+")
+# Only whitespace-free markers can sit inside a single token; multi-word markers rely on
+# the substring fallback in _is_negated.
+_SINGLE_TOKEN_MARKERS = frozenset(marker for marker in PRIVATE_MARKERS if len(marker.split()) == 1)
+# "<negation> <marker>" phrases for the substring fallback, built once instead of per check.
+_NEGATED_PHRASES = {marker: tuple(f"{neg} {marker}" for neg in _NEGATION_TOKENS) for marker in PRIVATE_MARKERS}
+
+
+def _token_index(text: str) -> tuple[list[int], list[bool]]:
+    """
+    Tokenize text once: token start offsets, and for each token whether a negation token
+    appears within the _NEGATION_WINDOW tokens before it.
+    """
+    starts: list[int] = []
+    negations: list[bool] = []
+    for match in _TOKEN_RE.finditer(text):
+        starts.append(match.start())
+        negations.append(match.group().startswith(_NEGATION_TOKENS))
+    preceded = [any(negations[max(0, idx - _NEGATION_WINDOW) : idx]) for idx in range(len(negations))]
+    return starts, preceded
+
+
+def _is_negated(text: str, marker: str, index: tuple[list[int], list[bool]]) -> bool:
+    """
+    Treat a marker as negated if a negation token appears within a short window
+    before it (e.g., "avoid pii and phi", "no confidential or proprietary data").
+    """
+    if marker in _SINGLE_TOKEN_MARKERS:
+        starts, preceded = index
+        pos = text.find(marker)
+        while pos != -1:
+            if preceded[bisect_right(starts, pos) - 1]:
+                return True
+            pos = text.find(marker, pos + 1)
+    # fallback for simple substring patterns
+    return any(phrase in text for phrase in _NEGATED_PHRASES[marker])
 
 
 def find_private_indicators(values: Iterable[str | None]) -> list[str]:
     """
     Return a list of markers detected in user-supplied text.
     """
-    hits: set[str] = set()
-    negation_tokens = ("no", "not", "without", "avoid")
-
-    def is_negated(text: str, marker: str) -> bool:
-        """
-        Treat a marker as negated if a negation token appears within a short window
-        before it (e.g., "avoid pii and phi", "no confidential or proprietary data").
-        """
-        tokens = text.split()
-        for idx, tok in enumerate(tokens):
-            if marker not in tok:
-                continue
-            window = tokens[max(0, idx - 3) : idx]
-            if any(any(w.startswith(neg) for neg in negation_tokens) for w in window):
-                return True
-            if "avoid" in window:
-                return True
-        # fallback for simple substring patterns
-        if any(f"{neg} {marker}" in text for neg in negation_tokens):
-            return True
-        return False
+    texts = [value.lower() for value in values if value]
+    # One scan over the joined text rules out markers that appear nowhere; the separator
+    # cannot occur inside a marker, so no match spans two fields.
+    blob = "\x1f".join(texts)
+    candidates = [marker for marker in PRIVATE_MARKERS if marker in blob]
+    if not candidates:
+        return []
 
-    for value in values:
-        if not value:
+    hits: set[str] = set()
+    for text in texts:
+        present = [marker for marker in candidates if marker not in hits and marker in text]
+        if not present:
             continue
-        text = value.lower()
-        for marker in PRIVATE_MARKERS:
-            if marker not in text:
-                continue
+        # tokenized once per text and shared by every marker found in it
+        index = _token_index(text)
+        for marker in present:
             # skip if marker is clearly negated (e.g., "avoid pii and phi")
-            if is_negated(text, marker):
-                continue
-            hits.add(marker)
+            if not _is_negated(text, marker, index):
+                hits.add(marker)
     return sorted(hits)
@@ -3,17 +3,21 @@ from __future__ import annotations
 import base64
 import hashlib
 import hmac
-import json
 import logging
+import re
 import time
+from collections import OrderedDict
+from collections.abc import Iterator
 from dataclasses import dataclass
-from threading import Lock
+from functools import lru_cache
+from threading import Lock, Thread
 from typing import Any, Literal, cast
 
 import httpx
+import orjson
 from fastapi import Depends, Header, HTTPException, status
 
-from app.core.config import Settings, get_settings
+from app.core.config import Settings, get_request_settings
 
 logger = logging.getLogger(__name__)
 
@@ -33,26 +37,43 @@ ROLE_ALIASES: dict[str, Role] = {
 }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UserPrincipal:
     sub: str
     email: str | None
-    roles: set[Role]
+    roles: frozenset[Role]
     raw_claims: dict[str, Any]
 
 
-def _b64url_decode(data: str) -> bytes:
-    padded = data + "=" * (-len(data) % 4)
-    return base64.urlsafe_b64decode(padded.encode("utf-8"))
+_B64URL_RE = re.compile(rb"[A-Za-z0-9_-]*")
 
 
-def _b64url_encode(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).decode("utf-8").rstrip("=")
+def _b64url_decode(data: str | bytes) -> bytes:
+    # base64url is pure ASCII, so non-ASCII input fails here instead of being decoded.
+    raw = data.encode("ascii") if isinstance(data, str) else data
+    return base64.urlsafe_b64decode(raw + b"=="[: -len(raw) % 4])
 
 
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode_strict(data: str | bytes) -> bytes:
+    # Only the canonical unpadded encoding is accepted: no standard-alphabet characters, no slack trailing bits.
+    raw = data.encode("ascii") if isinstance(data, str) else data
+    if not _B64URL_RE.fullmatch(raw):
+        raise ValueError("Invalid base64url alphabet.")
+    decoded = base64.urlsafe_b64decode(raw + b"=="[: -len(raw) % 4])
+    if _b64url_encode(decoded) != raw:
+        raise ValueError("Non-canonical base64url encoding.")
+    return decoded
+
+
+@lru_cache(maxsize=256)
 def _normalize_role(value: str) -> Role | None:
-    normalized = "".join(ch for ch in value.strip().lower() if ch.isalnum() or ch in {"_", "-"})
-    normalized = normalized.replace("-", "").replace("_", "")
+    # Role strings come from a small, highly repetitive set, so results are memoized.
+    # Dropping every non-alphanumeric character covers the old strip + "_"/"-" removal.
+    normalized = "".join(filter(str.isalnum, value.lower()))
     role = ROLE_ALIASES.get(normalized)
     if role:
         return role
@@ -65,73 +86,47 @@ def _normalize_role(value: str) -> Role | None:
     return None
 
 
+# Claims checked for roles when OASIS_JWT_ROLES_CLAIM is unset (common claims in PoCs).
+_DEFAULT_ROLE_CLAIMS = ("roles", "groups", "permissions", "https://oasis.ai/roles")
+# Auth0-style custom claim keys (e.g., https://myapp.example.com/roles).
+_CUSTOM_ROLE_SUFFIXES = ("/roles", "/groups", "/permissions")
+_NESTED_ROLE_KEYS = ("roles", "groups", "permissions")
+
+
+def _role_names(source: object, *, nested: bool = True) -> Iterator[str]:
+    """
+    Yield raw role names from a claim value: a comma-separated string, a list of strings or
+    {name|role|value} objects, or (one level deep) a dict holding such values under
+    roles/groups/permissions.
+    """
+    if isinstance(source, str):
+        yield from source.split(",")
+    elif isinstance(source, list):
+        for item in source:
+            if isinstance(item, dict):
+                item = item.get("name") or item.get("role") or item.get("value")
+            if isinstance(item, str):
+                yield item
+    elif nested and isinstance(source, dict):
+        for key in _NESTED_ROLE_KEYS:
+            yield from _role_names(source.get(key), nested=False)
+
+
 def _extract_roles(claims: dict[str, Any], settings: Settings) -> set[Role]:
-    role_sources: list[object] = []
     if settings.jwt_roles_claim:
-        role_sources.append(claims.get(settings.jwt_roles_claim))
+        role_sources: list[object] = [claims.get(settings.jwt_roles_claim)]
     else:
-        # common claims for roles/groups/permissions in PoCs
-        role_sources.extend(
-            [
-                claims.get("roles"),
-                claims.get("groups"),
-                claims.get("permissions"),
-                claims.get("https://oasis.ai/roles"),
-            ]
-        )
-        # Auth0-style custom claim keys (e.g., https://myapp.example.com/roles).
+        role_sources = [claims.get(key) for key in _DEFAULT_ROLE_CLAIMS]
         role_sources.extend(
-            [
-                value
-                for key, value in claims.items()
-                if isinstance(key, str) and key.endswith(("/roles", "/groups", "/permissions"))
-            ]
+            value for key, value in claims.items() if isinstance(key, str) and key.endswith(_CUSTOM_ROLE_SUFFIXES)
         )
 
     roles: set[Role] = set()
     for source in role_sources:
-        if not source:
-            continue
-        if isinstance(source, str):
-            for part in (p.strip() for p in source.split(",")):
-                role = _normalize_role(part)
-                if role:
-                    roles.add(role)
-            continue
-        if isinstance(source, list):
-            for item in source:
-                if isinstance(item, str):
-                    role = _normalize_role(item)
-                    if role:
-                        roles.add(role)
-                elif isinstance(item, dict):
-                    name = item.get("name") or item.get("role") or item.get("value")
-                    if isinstance(name, str):
-                        role = _normalize_role(name)
-                        if role:
-                            roles.add(role)
-            continue
-        if isinstance(source, dict):
-            for nested_key in ("roles", "groups", "permissions"):
-                nested_source = source.get(nested_key)
-                if isinstance(nested_source, str):
-                    for part in (p.strip() for p in nested_source.split(",")):
-                        role = _normalize_role(part)
-                        if role:
-                            roles.add(role)
-                elif isinstance(nested_source, list):
-                    for item in nested_source:
-                        if isinstance(item, str):
-                            role = _normalize_role(item)
-                            if role:
-                                roles.add(role)
-                        elif isinstance(item, dict):
-                            name = item.get("name") or item.get("role") or item.get("value")
-                            if isinstance(name, str):
-                                role = _normalize_role(name)
-                                if role:
-                                    roles.add(role)
-            continue
+        for name in _role_names(source):
+            role = _normalize_role(name)
+            if role:
+                roles.add(role)
     return roles
 
 
@@ -174,8 +169,8 @@ def _decode_hs256(token: str, settings: Settings) -> dict[str, Any]:
 
     header_b64, payload_b64, signature_b64 = parts
     try:
-        header = json.loads(_b64url_decode(header_b64))
-        payload = json.loads(_b64url_decode(payload_b64))
+        header = orjson.loads(_b64url_decode(header_b64))
+        payload = orjson.loads(_b64url_decode(payload_b64))
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token encoding.") from exc
 
@@ -185,8 +180,11 @@ def _decode_hs256(token: str, settings: Settings) -> dict[str, Any]:
 
     signing_input = f"{header_b64}.{payload_b64}".encode("utf-8")
     expected_sig = hmac.new(settings.jwt_secret.encode("utf-8"), signing_input, hashlib.sha256).digest()
-    expected_b64 = _b64url_encode(expected_sig)
-    if not hmac.compare_digest(expected_b64, signature_b64):
+    try:
+        received_sig = _b64url_decode_strict(signature_b64)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token signature.") from exc
+    if not hmac.compare_digest(expected_sig, received_sig):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token signature.")
 
     if not isinstance(payload, dict):
@@ -196,9 +194,14 @@ def _decode_hs256(token: str, settings: Settings) -> dict[str, Any]:
     return cast(dict[str, Any], payload)
 
 
-_JWKS_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
+# url -> (fetched_at, {kid: key}); keys are indexed once per fetch instead of per token.
+_JWKS_CACHE: dict[str, tuple[float, dict[str, dict[str, Any]]]] = {}
 _JWKS_LOCK = Lock()
 _JWKS_TTL_SECONDS = 3600
+# Past the TTL, cached keys keep serving while one background thread refetches them;
+# only beyond this age (e.g. the IdP has been unreachable for a day) do requests block.
+_JWKS_MAX_STALE_SECONDS = 86400
+_JWKS_REFRESHING: set[str] = set()
 
 
 def _jwks_url(settings: Settings) -> str:
@@ -213,13 +216,7 @@ def _jwks_url(settings: Settings) -> str:
     return f"{issuer}/.well-known/jwks.json"
 
 
-def _get_jwks(settings: Settings) -> dict[str, Any]:
-    url = _jwks_url(settings)
-    with _JWKS_LOCK:
-        cached = _JWKS_CACHE.get(url)
-        if cached and (time.time() - cached[0]) < _JWKS_TTL_SECONDS:
-            return cached[1]
-
+def _fetch_jwks(url: str) -> dict[str, dict[str, Any]]:
     try:
         res = httpx.get(url, timeout=5.0)
         res.raise_for_status()
@@ -229,11 +226,46 @@ def _get_jwks(settings: Settings) -> dict[str, Any]:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="JWKS fetch failed.") from exc
 
     if not isinstance(jwks, dict) or "keys" not in jwks:
+        logger.warning("rbac.jwks_invalid_payload url=%s", url)
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Invalid JWKS payload.")
 
+    by_kid: dict[str, dict[str, Any]] = {}
+    for key in jwks.get("keys") or []:
+        if isinstance(key, dict) and isinstance(key.get("kid"), str):
+            # first key wins on duplicate kids, as the old linear scan did
+            by_kid.setdefault(key["kid"], key)
     with _JWKS_LOCK:
-        _JWKS_CACHE[url] = (time.time(), jwks)
-    return jwks
+        _JWKS_CACHE[url] = (time.time(), by_kid)
+    return by_kid
+
+
+def _refresh_jwks(url: str) -> None:
+    try:
+        _fetch_jwks(url)
+    except HTTPException:
+        # already logged; the stale keys stay in place and the next request retries
+        pass
+    finally:
+        with _JWKS_LOCK:
+            _JWKS_REFRESHING.discard(url)
+
+
+def _get_jwks(settings: Settings) -> dict[str, dict[str, Any]]:
+    url = _jwks_url(settings)
+    with _JWKS_LOCK:
+        cached = _JWKS_CACHE.get(url)
+        if cached:
+            age = time.time() - cached[0]
+            if age < _JWKS_TTL_SECONDS:
+                return cached[1]
+            if age < _JWKS_MAX_STALE_SECONDS:
+                # stale-while-revalidate: a single refresh per URL, no stampede on the IdP
+                if url not in _JWKS_REFRESHING:
+                    _JWKS_REFRESHING.add(url)
+                    Thread(target=_refresh_jwks, args=(url,), name="jwks-refresh", daemon=True).start()
+                return cached[1]
+
+    return _fetch_jwks(url)
 
 
 def _decode_rs256(token: str, settings: Settings) -> dict[str, Any]:
@@ -254,12 +286,7 @@ def _decode_rs256(token: str, settings: Settings) -> dict[str, Any]:
     if not isinstance(kid, str) or not kid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token key id (kid).")
 
-    jwks = _get_jwks(settings)
-    rsa_key: dict[str, Any] | None = None
-    for key in jwks.get("keys", []):
-        if isinstance(key, dict) and key.get("kid") == kid:
-            rsa_key = key
-            break
+    rsa_key = _get_jwks(settings).get(kid)
     if rsa_key is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unknown token key id (kid).")
 
@@ -283,28 +310,102 @@ def _decode_rs256(token: str, settings: Settings) -> dict[str, Any]:
     return cast(dict[str, Any], claims)
 
 
+# Verified token -> claims, so repeat requests with the same token skip signature checks.
+# Entries expire at min(exp, now + TTL); tokens without exp are never cached.
+_CLAIMS_CACHE: OrderedDict[tuple[object, ...], tuple[float, dict[str, Any]]] = OrderedDict()
+_CLAIMS_CACHE_LOCK = Lock()
+_CLAIMS_CACHE_MAXSIZE = 4096
+_CLAIMS_CACHE_TTL_SECONDS = 300
+
+
+def _claims_cache_key(token: str, settings: Settings) -> tuple[object, ...]:
+    # Validation settings are part of the key so a config change never reuses old results.
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    return (digest, settings.jwt_secret, settings.jwt_jwks_url, settings.jwt_issuer, settings.jwt_audience)
+
+
+def _get_cached_claims(key: tuple[object, ...]) -> dict[str, Any] | None:
+    with _CLAIMS_CACHE_LOCK:
+        entry = _CLAIMS_CACHE.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del _CLAIMS_CACHE[key]
+            return None
+        _CLAIMS_CACHE.move_to_end(key)
+        return entry[1]
+
+
+def _cache_claims(key: tuple[object, ...], claims: dict[str, Any]) -> None:
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)):
+        return
+    now = time.time()
+    expires_at = min(float(exp), now + _CLAIMS_CACHE_TTL_SECONDS)
+    if expires_at <= now:
+        return
+    with _CLAIMS_CACHE_LOCK:
+        _CLAIMS_CACHE[key] = (expires_at, claims)
+        _CLAIMS_CACHE.move_to_end(key)
+        while len(_CLAIMS_CACHE) > _CLAIMS_CACHE_MAXSIZE:
+            _CLAIMS_CACHE.popitem(last=False)
+
+
 def _decode_and_verify(token: str, settings: Settings) -> dict[str, Any]:
+    cache_key = _claims_cache_key(token, settings)
+    cached = _get_cached_claims(cache_key)
+    if cached is not None:
+        return cached
+
     parts = token.split(".")
     if len(parts) != 3:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token format.")
     header_b64 = parts[0]
     try:
-        header = json.loads(_b64url_decode(header_b64))
+        header = orjson.loads(_b64url_decode(header_b64))
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token header.") from exc
 
-    alg = header.get("alg")
+    alg = header.get("alg") if isinstance(header, dict) else None
+    # A token for an algorithm this deployment is not configured for (e.g. RS256 on an HS256-only
+    # setup) is rejected before any JWKS/network work. With nothing configured at all, fall
+    # through so the decoders report the missing setting. A non-string alg (list, object) is
+    # rejected first, as it cannot be looked up in the algorithm set.
+    if not isinstance(alg, str) or (settings.jwt_algorithms and alg not in settings.jwt_algorithms):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unsupported token algorithm.")
     if alg == "HS256":
-        return _decode_hs256(token, settings)
-    if alg == "RS256":
-        return _decode_rs256(token, settings)
-    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unsupported token algorithm.")
+        claims = _decode_hs256(token, settings)
+    elif alg == "RS256":
+        claims = _decode_rs256(token, settings)
+    else:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unsupported token algorithm.")
+    # only reached once the signature and standard claims have been verified
+    _cache_claims(cache_key, claims)
+    return claims
+
+
+@lru_cache(maxsize=64)
+def _demo_principal(x_user_role: str | None, default_roles: tuple[str, ...]) -> UserPrincipal:
+    # Non-JWT modes map the same few header/default role combinations to the same principal,
+    # so it is built once per combination and shared (UserPrincipal is frozen).
+    roles: set[Role] = set()
+    if x_user_role:
+        for part in (p.strip() for p in x_user_role.split(",")):
+            role = _normalize_role(part)
+            if role:
+                roles.add(role)
+    if not roles:
+        for r in default_roles:
+            role = _normalize_role(r)
+            if role:
+                roles.add(role)
+    return UserPrincipal(sub="demo", email=None, roles=frozenset(roles or {"analyst"}), raw_claims={})
 
 
 def get_current_user(
     authorization: str | None = Header(default=None),
     x_user_role: str | None = Header(default=None, alias="x-user-role"),
-    settings: Settings = Depends(get_settings),
+    settings: Settings = Depends(get_request_settings),
 ) -> UserPrincipal:
     """
     Role-based identity for PoC.
@@ -314,24 +415,12 @@ def get_current_user(
     - OASIS_AUTH_MODE=jwt: validates Bearer JWT and extracts roles/groups claim
     """
     if settings.auth_mode in {"disabled", "api_key"}:
-        roles: set[Role] = set()
-        if x_user_role:
-            for part in (p.strip() for p in x_user_role.split(",")):
-                role = _normalize_role(part)
-                if role:
-                    roles.add(role)
-        if not roles:
-            for r in settings.default_roles:
-                role = _normalize_role(r)
-                if role:
-                    roles.add(role)
-        if not roles:
-            roles = {"analyst"}
-        return UserPrincipal(sub="demo", email=None, roles=roles, raw_claims={})
-
-    if not authorization or not authorization.lower().startswith("bearer "):
+        return _demo_principal(x_user_role or None, tuple(settings.default_roles))
+
+    # Only the 7-character scheme prefix is case-folded, not the whole header.
+    if not authorization or authorization[:7].lower() != "bearer ":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Bearer token.")
-    token = authorization.split(" ", 1)[1].strip()
+    token = authorization[7:].strip()
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Bearer token.")
 
@@ -347,16 +436,15 @@ def get_current_user(
     email = claims.get("email")
     if not isinstance(email, str):
         email = None
-    return UserPrincipal(sub=sub, email=email, roles=roles, raw_claims=claims)
+    return UserPrincipal(sub=sub, email=email, roles=frozenset(roles), raw_claims=claims)
 
 
 def require_roles(*allowed: Role):
-    allowed_set = set(allowed)
+    # admin passes every check, so it is folded into the allowed set once here
+    allowed_set = frozenset(allowed) | {"admin"}
 
     def _dep(user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
-        if "admin" in user.roles:
-            return user
-        if not user.roles.intersection(allowed_set):
+        if user.roles.isdisjoint(allowed_set):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient role for this action.")
         return user
 
@@ -1,30 +1,104 @@
 from __future__ import annotations
 
-import json
+import heapq
 import os
 import hashlib
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from threading import Lock
-from typing import Any
-from uuid import uuid4
+from secrets import token_hex
+from threading import Condition, Lock, Timer
+from typing import Any, BinaryIO
 
+import orjson
 from fastapi import Depends
 
-from app.core.config import Settings, get_settings
+from app.core.config import Settings, get_request_settings
 
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+# Apply-log entries written between full snapshots of the store file.
+_SNAPSHOT_EVERY_OPS = 100
+# Log appends reach the OS immediately; the fsync for a burst of them is coalesced into one
+# call at most this long after the first write (feedback writes sync immediately).
+_FSYNC_DELAY_SECONDS = 0.05
+# Upper bound for list_recent_versions / list_recent_feedback.
+_RECENT_LIMIT = 200
+
+
 def _atomic_write_json(path: Path, payload: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
     tmp_path = path.with_suffix(f"{path.suffix}.tmp")
-    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Same layout as json.dumps(ensure_ascii=False, indent=2), serialized in C.
+    raw = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    try:
+        tmp_path.write_bytes(raw)
+    except FileNotFoundError:
+        # only the first write into a fresh directory pays for the mkdir
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(raw)
     os.replace(tmp_path, path)
 
 
+def _created_at_of_item(item: tuple[str, dict[str, Any]]) -> str:
+    return item[1].get("created_at") or ""
+
+
+def _stat_key(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class _ReadWriteLock:
+    """
+    Many concurrent readers or one writer; a waiting writer holds off new readers so writes
+    are not starved. Not reentrant.
+    """
+
+    def __init__(self) -> None:
+        self._cond = Condition(Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
 def _empty_state() -> dict[str, Any]:
     return {
         "schema_version": 1,
@@ -41,19 +115,44 @@ class OasisStore:
     Minimal JSON-file persistence for PoC workflows (projects -> assessments -> versioned runs).
 
     This is intentionally lightweight (no DB) and should not be treated as production storage.
+
+    Writes are appended to a JSONL log next to the store file (`<store>.log`) as the records
+    they touch, and the full state is snapshotted into the store file every
+    _SNAPSHOT_EVERY_OPS writes (and on flush()), after which the log is truncated. State is
+    held in memory and only re-read when the store file or log changes on disk (e.g. another
+    worker process wrote to it); records are replaced, never mutated in place, so dicts
+    handed to callers stay consistent.
     """
 
     def __init__(self, path: Path) -> None:
         self._path = path
-        self._lock = Lock()
-
-    def _load_unlocked(self) -> dict[str, Any]:
-        if not self._path.exists():
+        self._log_path = path.with_name(f"{path.name}.log")
+        self._rwlock = _ReadWriteLock()
+        self._state: dict[str, Any] | None = None
+        # (store file, log) stat keys as of our last load or write
+        self._disk_signature: tuple[object, object] = (None, None)
+        # project_id -> assessment ids in insertion order; derived from the state, not persisted
+        self._assessments_by_project: dict[str, dict[str, None]] = {}
+        # newest-first ids per table, so the audit lists need no full sort
+        self._recent: dict[str, deque[str]] = {
+            "versions": deque(maxlen=_RECENT_LIMIT),
+            "feedback": deque(maxlen=_RECENT_LIMIT),
+        }
+        self._log_file: BinaryIO | None = None
+        self._pending_ops = 0
+        self._fsync_scheduled = False
+        # Serializes log fsyncs, which run on a dup'd fd outside _rwlock so that neither
+        # readers nor writers ever wait on disk flushes.
+        self._flush_lock = Lock()
+
+    def _read_snapshot_unlocked(self) -> dict[str, Any]:
+        try:
+            raw = self._path.read_bytes().strip()
+        except FileNotFoundError:
             return _empty_state()
-        raw = self._path.read_text(encoding="utf-8").strip()
         if not raw:
             return _empty_state()
-        data = json.loads(raw)
+        data = orjson.loads(raw)
         if not isinstance(data, dict):
             raise ValueError("Invalid store format: expected JSON object.")
         return {
@@ -61,23 +160,161 @@ class OasisStore:
             **data,
         }
 
-    def _save_unlocked(self, data: dict[str, Any]) -> None:
+    def _replay_log_unlocked(self, data: dict[str, Any]) -> tuple[int, bool]:
+        """
+        Apply logged writes on top of the snapshot; returns (entries applied, clean tail).
+        """
+        try:
+            raw = self._log_path.read_bytes()
+        except FileNotFoundError:
+            return 0, True
+        applied = 0
+        for line in raw.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = orjson.loads(line)
+                puts = entry["puts"]
+            except (ValueError, KeyError, TypeError):
+                # torn tail from an interrupted append; everything before it is intact
+                return applied, False
+            for table, key, record in puts:
+                data.setdefault(table, {})[key] = record
+            applied += 1
+        return applied, True
+
+    def _current_disk_signature(self) -> tuple[object, object]:
+        return (_stat_key(self._path), _stat_key(self._log_path))
+
+    @contextmanager
+    def _reading(self) -> Iterator[dict[str, Any]]:
+        """
+        Shared access to the loaded state; escalates to the write lock only to (re)load it.
+        """
+        with self._rwlock.read():
+            if self._state is not None and self._current_disk_signature() == self._disk_signature:
+                yield self._state
+                return
+        with self._rwlock.write():
+            yield self._load_unlocked()
+
+    def _load_unlocked(self) -> dict[str, Any]:
+        # Two stat calls per access instead of re-reading and parsing the whole file.
+        signature = self._current_disk_signature()
+        if self._state is None or signature != self._disk_signature:
+            data = self._read_snapshot_unlocked()
+            applied, clean = self._replay_log_unlocked(data)
+            self._state = data
+            self._pending_ops = applied
+            self._assessments_by_project = {}
+            for assessment_id, assessment in data["assessments"].items():
+                self._index_assessment_unlocked(assessment_id, assessment)
+            for table, recent in self._recent.items():
+                recent.clear()
+                newest = heapq.nlargest(_RECENT_LIMIT, data[table].items(), key=_created_at_of_item)
+                recent.extend(record_id for record_id, _ in newest)
+            if not clean:
+                # rewrite the snapshot so new appends never follow a partial line
+                self._snapshot_unlocked(data)
+            self._disk_signature = self._current_disk_signature()
+        return self._state
+
+    def _index_assessment_unlocked(self, assessment_id: str, assessment: dict[str, Any]) -> None:
+        project_id = assessment.get("project_id")
+        if isinstance(project_id, str):
+            self._assessments_by_project.setdefault(project_id, {})[assessment_id] = None
+
+    def _snapshot_unlocked(self, data: dict[str, Any]) -> None:
         _atomic_write_json(self._path, data)
+        if self._log_file is not None:
+            self._log_file.truncate(0)
+        else:
+            try:
+                os.truncate(self._log_path, 0)
+            except FileNotFoundError:
+                pass
+        self._pending_ops = 0
+
+    def _commit_unlocked(
+        self,
+        op: str,
+        puts: list[tuple[str, str, dict[str, Any]]],
+        *,
+        durable: bool = False,
+    ) -> int | None:
+        """
+        Apply replaced records to the in-memory state and append them to the log.
+
+        When durable is set, returns a dup of the log fd that the caller must pass to
+        _fsync_fd() after releasing the write lock; otherwise the append is covered by the
+        next coalesced fsync and None is returned.
+        """
+        data = self._load_unlocked()
+        for table, key, record in puts:
+            if table in self._recent and key not in data[table]:
+                self._recent[table].appendleft(key)
+            data[table][key] = record
+            if table == "assessments":
+                self._index_assessment_unlocked(key, record)
+
+        if self._log_file is None:
+            try:
+                self._log_file = open(self._log_path, "ab")
+            except FileNotFoundError:
+                self._log_path.parent.mkdir(parents=True, exist_ok=True)
+                self._log_file = open(self._log_path, "ab")
+        self._log_file.write(orjson.dumps({"op": op, "puts": puts}) + b"\n")
+        self._log_file.flush()
+        sync_fd = os.dup(self._log_file.fileno()) if durable else None
+        if not durable and not self._fsync_scheduled:
+            self._fsync_scheduled = True
+            timer = Timer(_FSYNC_DELAY_SECONDS, self._sync_log)
+            timer.daemon = True
+            timer.start()
+
+        self._pending_ops += 1
+        if self._pending_ops >= _SNAPSHOT_EVERY_OPS:
+            self._snapshot_unlocked(data)
+        self._disk_signature = self._current_disk_signature()
+        return sync_fd
+
+    def _fsync_fd(self, fd: int) -> None:
+        try:
+            with self._flush_lock:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _sync_log(self) -> None:
+        # Only the fd dup needs the store lock; the flush itself happens after releasing it.
+        with self._rwlock.write():
+            self._fsync_scheduled = False
+            if self._log_file is None:
+                return
+            fd = os.dup(self._log_file.fileno())
+        self._fsync_fd(fd)
+
+    def flush(self) -> None:
+        """
+        Snapshot any logged writes into the store file and truncate the log.
+        """
+        with self._rwlock.write():
+            if self._state is not None and self._pending_ops:
+                self._snapshot_unlocked(self._state)
+                self._disk_signature = self._current_disk_signature()
 
     def list_projects(self) -> list[dict[str, Any]]:
-        with self._lock:
-            data = self._load_unlocked()
+        with self._reading() as data:
             projects = list(data["projects"].values())
         return sorted(projects, key=lambda p: p.get("updated_at") or "", reverse=True)
 
     def get_project(self, project_id: str) -> dict[str, Any] | None:
-        with self._lock:
-            data = self._load_unlocked()
+        with self._reading() as data:
             return data["projects"].get(project_id)
 
     def create_project(self, name: str, description: str | None = None) -> dict[str, Any]:
         now = _utc_now_iso()
-        project_id = uuid4().hex
+        project_id = token_hex(16)
         record: dict[str, Any] = {
             "project_id": project_id,
             "name": name,
@@ -85,24 +322,26 @@ class OasisStore:
             "created_at": now,
             "updated_at": now,
         }
-        with self._lock:
-            data = self._load_unlocked()
-            data["projects"][project_id] = record
-            self._save_unlocked(data)
+        with self._rwlock.write():
+            self._commit_unlocked("create_project", [("projects", project_id, record)])
         return record
 
     def list_assessments(self, project_id: str) -> list[dict[str, Any]]:
-        with self._lock:
-            data = self._load_unlocked()
-            assessments = [
-                a for a in data["assessments"].values() if a.get("project_id") == project_id
-            ]
+        with self._reading() as data:
+            if project_id not in data["projects"]:
+                raise KeyError("Project not found.")
+            by_id = data["assessments"]
+            assessments = [by_id[aid] for aid in self._assessments_by_project.get(project_id, ())]
         return sorted(assessments, key=lambda a: a.get("updated_at") or "", reverse=True)
 
     def get_assessment(self, assessment_id: str) -> dict[str, Any] | None:
-        with self._lock:
-            data = self._load_unlocked()
-            return data["assessments"].get(assessment_id)
+        with self._reading() as data:
+            assessment = data["assessments"].get(assessment_id)
+            if assessment is None or "payload" in assessment:
+                return assessment
+            # once versions exist, the current payload is the latest version's request
+            latest = data["versions"].get(assessment.get("latest_version_id") or "") or {}
+            return {**assessment, "payload": latest.get("request") or {}}
 
     def create_assessment(
         self,
@@ -112,7 +351,7 @@ class OasisStore:
         payload: dict[str, Any],
     ) -> dict[str, Any]:
         now = _utc_now_iso()
-        assessment_id = uuid4().hex
+        assessment_id = token_hex(16)
         record: dict[str, Any] = {
             "assessment_id": assessment_id,
             "project_id": project_id,
@@ -125,13 +364,15 @@ class OasisStore:
             "version_ids": [],
             "latest_version_id": None,
         }
-        with self._lock:
+        with self._rwlock.write():
             data = self._load_unlocked()
             if project_id not in data["projects"]:
                 raise KeyError("Project not found.")
-            data["assessments"][assessment_id] = record
-            data["projects"][project_id]["updated_at"] = now
-            self._save_unlocked(data)
+            project = {**data["projects"][project_id], "updated_at": now}
+            self._commit_unlocked(
+                "create_assessment",
+                [("assessments", assessment_id, record), ("projects", project_id, project)],
+            )
         return record
 
     def create_version(
@@ -151,8 +392,8 @@ class OasisStore:
         rag_enabled: bool | None = None,
     ) -> dict[str, Any]:
         now = _utc_now_iso()
-        version_id = uuid4().hex
-        with self._lock:
+        version_id = token_hex(16)
+        with self._rwlock.write():
             data = self._load_unlocked()
             assessment = data["assessments"].get(assessment_id)
             if not assessment:
@@ -177,22 +418,25 @@ class OasisStore:
                 "feedback_ids": [],
             }
 
-            data["versions"][version_id] = record
-            assessment["version_count"] = version_number
-            assessment.setdefault("version_ids", []).append(version_id)
-            assessment["latest_version_id"] = version_id
-            assessment["payload"] = request_payload
-            assessment["updated_at"] = now
+            # The request payload is stored once, on the version; get_assessment resolves it
+            # through latest_version_id instead of a second copy on the assessment.
+            assessment = {
+                **{k: v for k, v in assessment.items() if k != "payload"},
+                "version_count": version_number,
+                "version_ids": [*(assessment.get("version_ids") or []), version_id],
+                "latest_version_id": version_id,
+                "updated_at": now,
+            }
+            puts = [("versions", version_id, record), ("assessments", assessment_id, assessment)]
 
             project_id = assessment.get("project_id")
             if project_id and project_id in data["projects"]:
-                data["projects"][project_id]["updated_at"] = now
-            self._save_unlocked(data)
+                puts.append(("projects", project_id, {**data["projects"][project_id], "updated_at": now}))
+            self._commit_unlocked("create_version", puts)
         return record
 
     def list_versions(self, assessment_id: str) -> list[dict[str, Any]]:
-        with self._lock:
-            data = self._load_unlocked()
+        with self._reading() as data:
             assessment = data["assessments"].get(assessment_id)
             if not assessment:
                 raise KeyError("Assessment not found.")
@@ -201,17 +445,25 @@ class OasisStore:
         return sorted(versions, key=lambda v: int(v.get("version_number") or 0), reverse=True)
 
     def get_version(self, version_id: str) -> dict[str, Any] | None:
-        with self._lock:
-            data = self._load_unlocked()
+        with self._reading() as data:
             return data["versions"].get(version_id)
 
+    def get_versions_bulk(self, version_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Fetch several versions with a single store load; unknown ids are omitted.
+        """
+        with self._reading() as data:
+            versions = data["versions"]
+            return {vid: versions[vid] for vid in version_ids if vid in versions}
+
+    def _list_recent(self, table: str, limit: int) -> list[dict[str, Any]]:
+        capped = max(1, min(int(limit), _RECENT_LIMIT))
+        with self._reading() as data:
+            records = data[table]
+            return [records[record_id] for record_id in islice(self._recent[table], capped)]
+
     def list_recent_versions(self, limit: int = 50) -> list[dict[str, Any]]:
-        capped = max(1, min(int(limit), 200))
-        with self._lock:
-            data = self._load_unlocked()
-            versions = list(data.get("versions", {}).values())
-        versions_sorted = sorted(versions, key=lambda v: v.get("created_at") or "", reverse=True)
-        return versions_sorted[:capped]
+        return self._list_recent("versions", limit)
 
     def create_feedback(
         self,
@@ -225,7 +477,7 @@ class OasisStore:
         reviewer: str | None,
     ) -> dict[str, Any]:
         now = _utc_now_iso()
-        feedback_id = uuid4().hex
+        feedback_id = token_hex(16)
         record: dict[str, Any] = {
             "feedback_id": feedback_id,
             "assessment_id": assessment_id,
@@ -237,7 +489,7 @@ class OasisStore:
             "recommended_edits": recommended_edits,
             "reviewer": reviewer,
         }
-        with self._lock:
+        with self._rwlock.write():
             data = self._load_unlocked()
             version = data["versions"].get(version_id)
             if not version:
@@ -246,14 +498,18 @@ class OasisStore:
                 # keep compatibility with older clients that may send mismatched assessment IDs
                 assessment_id = version.get("assessment_id") or assessment_id
                 record["assessment_id"] = assessment_id
-            data["feedback"][feedback_id] = record
-            version.setdefault("feedback_ids", []).append(feedback_id)
-            self._save_unlocked(data)
+            version = {**version, "feedback_ids": [*(version.get("feedback_ids") or []), feedback_id]}
+            sync_fd = self._commit_unlocked(
+                "create_feedback",
+                [("feedback", feedback_id, record), ("versions", version_id, version)],
+                durable=True,
+            )
+        if sync_fd is not None:
+            self._fsync_fd(sync_fd)
         return record
 
     def list_feedback(self, assessment_id: str, version_id: str) -> list[dict[str, Any]]:
-        with self._lock:
-            data = self._load_unlocked()
+        with self._reading() as data:
             version = data["versions"].get(version_id)
             if not version:
                 raise KeyError("Version not found.")
@@ -264,16 +520,10 @@ class OasisStore:
         return sorted(items, key=lambda f: f.get("created_at") or "", reverse=True)
 
     def list_recent_feedback(self, limit: int = 50) -> list[dict[str, Any]]:
-        capped = max(1, min(int(limit), 200))
-        with self._lock:
-            data = self._load_unlocked()
-            feedback_items = list(data.get("feedback", {}).values())
-        feedback_sorted = sorted(feedback_items, key=lambda f: f.get("created_at") or "", reverse=True)
-        return feedback_sorted[:capped]
+        return self._list_recent("feedback", limit)
 
     def list_prompt_templates(self) -> list[dict[str, Any]]:
-        with self._lock:
-            data = self._load_unlocked()
+        with self._reading() as data:
             templates = list(data.get("prompt_templates", {}).values())
         return sorted(templates, key=lambda t: t.get("updated_at") or "", reverse=True)
 
@@ -281,8 +531,7 @@ class OasisStore:
         key = name.strip()
         if not key:
             return None
-        with self._lock:
-            data = self._load_unlocked()
+        with self._reading() as data:
             return (data.get("prompt_templates") or {}).get(key)
 
     def upsert_prompt_template(
@@ -299,27 +548,33 @@ class OasisStore:
             raise ValueError("Template content is required.")
 
         now = _utc_now_iso()
-        sha = hashlib.sha256(content.encode("utf-8")).hexdigest()
-        with self._lock:
+        sha = hashlib.new("sha256", content.encode("utf-8"), usedforsecurity=False).hexdigest()
+        with self._rwlock.write():
             data = self._load_unlocked()
-            templates = data.setdefault("prompt_templates", {})
-            existing = templates.get(key)
+            existing = data["prompt_templates"].get(key)
             if existing:
+                latest = (existing.get("versions") or [{}])[-1]
+                if latest.get("sha256") == sha and latest.get("notes") == notes:
+                    # re-saving identical content and notes would only add a duplicate version
+                    return existing
                 current_version = int(existing.get("current_version") or 0) + 1
-                existing["current_version"] = current_version
-                existing["updated_at"] = now
-                existing.setdefault("versions", []).append(
-                    {
-                        "version": current_version,
-                        "created_at": now,
-                        "sha256": sha,
-                        "notes": notes,
-                        "content": content,
-                    }
-                )
-                templates[key] = existing
-                self._save_unlocked(data)
-                return existing
+                updated = {
+                    **existing,
+                    "current_version": current_version,
+                    "updated_at": now,
+                    "versions": [
+                        *(existing.get("versions") or []),
+                        {
+                            "version": current_version,
+                            "created_at": now,
+                            "sha256": sha,
+                            "notes": notes,
+                            "content": content,
+                        },
+                    ],
+                }
+                self._commit_unlocked("upsert_prompt_template", [("prompt_templates", key, updated)])
+                return updated
 
             record: dict[str, Any] = {
                 "name": key,
@@ -336,8 +591,7 @@ class OasisStore:
                     }
                 ],
             }
-            templates[key] = record
-            self._save_unlocked(data)
+            self._commit_unlocked("upsert_prompt_template", [("prompt_templates", key, record)])
             return record
 
 
@@ -345,10 +599,24 @@ _STORE_CACHE: dict[str, OasisStore] = {}
 _STORE_CACHE_LOCK = Lock()
 
 
-def get_store(settings: Settings = Depends(get_settings)) -> OasisStore:
+def store_for_path(store_path: str) -> OasisStore:
+    """
+    Process-wide OasisStore for a path, so every caller shares one in-memory state and log.
+    """
     with _STORE_CACHE_LOCK:
-        store = _STORE_CACHE.get(settings.store_path)
+        store = _STORE_CACHE.get(store_path)
         if store is None:
-            store = OasisStore(Path(settings.store_path))
-            _STORE_CACHE[settings.store_path] = store
+            store = OasisStore(Path(store_path))
+            _STORE_CACHE[store_path] = store
         return store
+
+
+def flush_stores() -> None:
+    with _STORE_CACHE_LOCK:
+        stores = list(_STORE_CACHE.values())
+    for store in stores:
+        store.flush()
+
+
+def get_store(settings: Settings = Depends(get_request_settings)) -> OasisStore:
+    return store_for_path(settings.store_path)
@@ -1,18 +1,35 @@
+import hashlib
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.v1.routes import router as api_router
 from app.core.config import get_settings
+from app.db.store import flush_stores
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # fold any logged store writes into the snapshot file on shutdown
+    flush_stores()
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title=settings.project_name, version="0.1.0")
+    app = FastAPI(
+        title=settings.project_name,
+        version="0.1.0",
+        default_response_class=ORJSONResponse,
+        lifespan=_lifespan,
+    )
+    app.state.settings = settings
 
     allow_credentials = "*" not in settings.allowed_origins
     if not allow_credentials and settings.allowed_origins != ["*"]:
@@ -41,21 +58,29 @@ def create_app() -> FastAPI:
         if assets_dir.exists():
             app.mount("/assets", StaticFiles(directory=assets_dir), name="assets")
 
+        # index.html answers every client-side route; it is small, so serve it from memory
+        # instead of re-opening and re-stating the file for each SPA fallback.
+        index_bytes = (dist_path / "index.html").read_bytes()
+        index_etag = f'"{hashlib.sha256(index_bytes).hexdigest()[:32]}"'
+
+        def index_response(request: Request) -> Response:
+            if request.headers.get("if-none-match") == index_etag:
+                return Response(status_code=304, headers={"ETag": index_etag})
+            return Response(content=index_bytes, media_type="text/html", headers={"ETag": index_etag})
+
         @app.get("/", include_in_schema=False)
-        async def serve_spa_root() -> FileResponse:
-            return FileResponse(dist_path / "index.html")
+        async def serve_spa_root(request: Request) -> Response:
+            return index_response(request)
+
+        # The bundle is immutable once deployed, so its file list is built once; a set lookup
+        # replaces resolve() + is_file() per request and also rules out path traversal.
+        spa_files = frozenset(p.relative_to(dist_path).as_posix() for p in dist_path.rglob("*") if p.is_file())
 
         @app.get("/{full_path:path}", include_in_schema=False)
-        async def serve_spa_paths(full_path: str) -> FileResponse:
-            candidate = (dist_path / full_path).resolve()
-            try:
-                candidate.relative_to(dist_path)
-            except ValueError:
-                return FileResponse(dist_path / "index.html")
-
-            if candidate.is_file():
-                return FileResponse(candidate)
-            return FileResponse(dist_path / "index.html")
+        async def serve_spa_paths(full_path: str, request: Request) -> Response:
+            if full_path in spa_files:
+                return FileResponse(dist_path / full_path)
+            return index_response(request)
     else:
         logging.getLogger(__name__).info(
             "Frontend build directory not found; API will serve without SPA bundle."
@@ -1,10 +1,20 @@
+import asyncio
+import hashlib
 import json
 import logging
 import os
 import re
-from typing import Protocol
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Protocol
 from uuid import uuid4
 
+import orjson
+from pydantic import ValidationError
+
 from app.api.v1.schemas import (
     ControlFrameworkMapping,
     PublicReference,
@@ -18,6 +28,9 @@ from app.services.prompt_engine import SYSTEM_PROMPT, build_user_prompt
 
 logger = logging.getLogger(__name__)
 
+# API `mode` value -> run_llm(force_mock=...). Unknown modes fall back to auto (None).
+MODE_FORCE_MOCK: dict[str, bool | None] = {"auto": None, "mock": True, "live": False}
+
 RISK_RESPONSE_TOOL_NAME = "risk_response"
 
 RISK_RESPONSE_TOOL_SCHEMA = {
@@ -161,23 +174,31 @@ RISK_RESPONSE_TOOL_SCHEMA = {
 }
 
 try:
-    from openai import OpenAI  # type: ignore
+    from openai import AsyncOpenAI  # type: ignore
 except Exception:  # pragma: no cover - dependency not installed in mock mode
-    OpenAI = None
+    AsyncOpenAI = None
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - only needed for the opt-in semantic cache
+    np = None
 
 
 class LLMProvider(Protocol):
     name: str
 
-    def generate(
+    async def generate(
         self,
         request: RiskRequest,
         settings: Settings,
         trace_id: str,
         model_override: str | None = None,
         system_prompt_override: str | None = None,
+        user_prompt: str | None = None,
     ) -> RiskResponse: ...
 
+    async def embed(self, text: str, settings: Settings, trace_id: str) -> list[float]: ...
+
 
 def _get_env_var(name: str) -> str | None:
     """
@@ -189,30 +210,41 @@ def _get_env_var(name: str) -> str | None:
         return value.strip()
 
     if os.name == "nt":
-        try:
-            import winreg  # type: ignore
+        return _get_registry_env_var(name)
+
+    return None
 
-            registry_locations = [
-                (winreg.HKEY_CURRENT_USER, r"Environment"),
-                (winreg.HKEY_LOCAL_MACHINE, r"SYSTEM\\CurrentControlSet\\Control\\Session Manager\\Environment"),
-            ]
-            for root, subkey in registry_locations:
-                try:
-                    with winreg.OpenKey(root, subkey) as reg_key:
-                        raw_value, _ = winreg.QueryValueEx(reg_key, name)
-                        if raw_value:
-                            return str(raw_value).strip()
-                except FileNotFoundError:
-                    continue
-                except OSError:
-                    continue
-        except Exception:
-            return None
+
+@lru_cache(maxsize=16)
+def _get_registry_env_var(name: str) -> str | None:
+    # Registry reads are syscalls on every live request otherwise; the result is kept for the
+    # process lifetime (call _get_registry_env_var.cache_clear() after changing the registry).
+    try:
+        import winreg  # type: ignore
+
+        registry_locations = [
+            (winreg.HKEY_CURRENT_USER, r"Environment"),
+            (winreg.HKEY_LOCAL_MACHINE, r"SYSTEM\\CurrentControlSet\\Control\\Session Manager\\Environment"),
+        ]
+        for root, subkey in registry_locations:
+            try:
+                with winreg.OpenKey(root, subkey) as reg_key:
+                    raw_value, _ = winreg.QueryValueEx(reg_key, name)
+                    if raw_value:
+                        return str(raw_value).strip()
+            except FileNotFoundError:
+                continue
+            except OSError:
+                continue
+    except Exception:
+        return None
 
     return None
 
 
-def _mock_response(trace_id: str) -> RiskResponse:
+@lru_cache(maxsize=1)
+def _mock_response_template() -> RiskResponse:
+    # Built and validated once; _mock_response hands out shallow copies with their own trace_id.
     mock_risks = [
         RiskItem(
             risk_id="R1",
@@ -390,7 +422,7 @@ def _mock_response(trace_id: str) -> RiskResponse:
         ),
     ]
     return RiskResponse(
-        trace_id=trace_id,
+        trace_id="",
         summary="Initial assessment highlights dependency on a single provider and evolving regulatory obligations. Current controls reduce some exposure but gaps remain in redundancy and mapped compliance measures.",
         risks=mock_risks,
         assumptions_gaps=[
@@ -560,28 +592,36 @@ def _quote_unquoted_object_keys(text: str) -> str:
 
 def _load_llm_json_object(content: str) -> dict:
     cleaned = _strip_code_fences(content)
+    try:
+        # Well-formed output parses as-is; only scan for an embedded object when it does not.
+        return orjson.loads(cleaned)
+    except orjson.JSONDecodeError:
+        pass
+
     candidates: list[str] = [cleaned]
     extracted = _extract_first_json_object(cleaned)
     if extracted and extracted != cleaned:
         candidates.append(extracted)
 
-    last_exc: json.JSONDecodeError | None = None
+    last_exc: orjson.JSONDecodeError | None = None
     for candidate in candidates:
-        try:
-            return json.loads(candidate)
-        except json.JSONDecodeError as exc:
-            last_exc = exc
+        # `cleaned` already failed the plain parse above, so it goes straight to the repairs.
+        if candidate is not cleaned:
+            try:
+                return orjson.loads(candidate)
+            except orjson.JSONDecodeError as exc:
+                last_exc = exc
 
         try:
-            return json.loads(_remove_trailing_commas(candidate))
-        except json.JSONDecodeError as exc:
+            return orjson.loads(_remove_trailing_commas(candidate))
+        except orjson.JSONDecodeError as exc:
             last_exc = exc
 
     for candidate in candidates:
         repaired = _remove_trailing_commas(_quote_unquoted_object_keys(candidate))
         try:
-            return json.loads(repaired)
-        except json.JSONDecodeError as exc:
+            return orjson.loads(repaired)
+        except orjson.JSONDecodeError as exc:
             last_exc = exc
 
     raise RuntimeError(f"Failed to parse LLM JSON: {last_exc}") from last_exc
@@ -594,43 +634,46 @@ def _parse_llm_dict(data: dict, trace_id: str) -> RiskResponse:
     data = dict(data)
     data.pop("trace_id", None)
 
-    missing = [key for key in ("summary", "risks") if key not in data]
-    if missing:
-        raise RuntimeError(f"LLM response missing required fields: {', '.join(missing)}")
-
-    # Normalize common model quirks (e.g., numeric risk_id returned as int).
-    if isinstance(data.get("risks"), list):
-        normalized_risks = []
-        for idx, risk in enumerate(data["risks"], start=1):
-            if not isinstance(risk, dict):
-                raise RuntimeError("LLM response risks must be objects.")
-            risk_copy = dict(risk)
-            if "risk_id" in risk_copy and not isinstance(risk_copy["risk_id"], str):
-                risk_copy["risk_id"] = str(risk_copy["risk_id"])
-            if "risk_id" not in risk_copy:
-                risk_copy["risk_id"] = f"R{idx}"
-            for list_key in (
-                "controls",
-                "control_mappings",
-                "mitigations",
-                "kpis",
-                "vulnerability_summaries",
-                "assumptions",
-            ):
-                if risk_copy.get(list_key) is None:
-                    risk_copy[list_key] = []
-            normalized_risks.append(risk_copy)
-        data["risks"] = normalized_risks
+    # Numeric ids and null lists are coerced by RiskItem's validators; only the positional
+    # default id needs the list here, and risks are copied only when one is missing.
+    risks = data.get("risks")
+    if isinstance(risks, list):
+        if not all(isinstance(risk, dict) for risk in risks):
+            raise RuntimeError("LLM response risks must be objects.")
+        if not all("risk_id" in risk for risk in risks):
+            data["risks"] = [
+                risk if "risk_id" in risk else {**risk, "risk_id": f"R{idx}"}
+                for idx, risk in enumerate(risks, start=1)
+            ]
 
     try:
         return RiskResponse(trace_id=trace_id, **data)
+    except ValidationError as exc:
+        # Top-level required fields are reported on their own, as callers log and surface them.
+        missing = [str(err["loc"][0]) for err in exc.errors() if err["type"] == "missing" and len(err["loc"]) == 1]
+        if missing:
+            raise RuntimeError(f"LLM response missing required fields: {', '.join(missing)}") from exc
+        raise RuntimeError(f"LLM response did not match schema: {exc}") from exc
     except Exception as exc:  # pragma: no cover - defensive against malformed model
         raise RuntimeError(f"LLM response did not match schema: {exc}") from exc
 
 
+class _LLMRiskResponse(RiskResponse):
+    # Model output carries no trace id; it is attached after validation.
+    trace_id: str = ""
+
+
 def _parse_llm_json(content: str, trace_id: str) -> RiskResponse:
-    data = _load_llm_json_object(content)
-    return _parse_llm_dict(data, trace_id)
+    # Fast path: well-formed JSON is parsed and validated in one pydantic-core pass. Anything it
+    # rejects (code fences, trailing commas, missing risk ids, ...) takes the repairing path below,
+    # which also produces the error message.
+    try:
+        parsed = _LLMRiskResponse.model_validate_json(content)
+    except ValueError:
+        return _parse_llm_dict(_load_llm_json_object(content), trace_id)
+    fields = {name: getattr(parsed, name) for name in RiskResponse.model_fields}
+    fields["trace_id"] = trace_id
+    return RiskResponse.model_construct(_fields_set=parsed.model_fields_set | {"trace_id"}, **fields)
 
 
 def _missing_required_sections(response: RiskResponse) -> list[str]:
@@ -678,15 +721,113 @@ def _extract_tool_call_arguments(message: object, expected_name: str) -> str | N
     return None
 
 
-def run_llm(
+
+def _mock_response(trace_id: str) -> RiskResponse:
+    return _mock_response_template().model_copy(update={"trace_id": trace_id})
+
+
+# Opt-in exact-match cache of live responses (settings.llm_cache_ttl_seconds > 0). Keyed on
+# everything that shapes the completion; each hit is handed out with its own trace id.
+_RESPONSE_CACHE: OrderedDict[bytes, tuple[float, RiskResponse]] = OrderedDict()
+_RESPONSE_CACHE_LOCK = Lock()
+_RESPONSE_CACHE_MAXSIZE = 512
+
+
+def _response_cache_key(*parts: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def _get_cached_response(key: bytes) -> RiskResponse | None:
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _RESPONSE_CACHE[key]
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+        return entry[1]
+
+
+def _cache_response(key: bytes, response: RiskResponse, ttl_seconds: int) -> None:
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic() + ttl_seconds, response)
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAXSIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+# Opt-in near-duplicate cache (settings.semantic_cache_enabled): per provider/model/system-prompt
+# scope, a fixed-size ring of unit-length prompt embeddings and the responses they produced.
+# Oldest entries are overwritten first.
+_SEMANTIC_CACHE_MAXSIZE = 1024
+_SEMANTIC_INDEXES: dict[bytes, "_SemanticIndex"] = {}
+_SEMANTIC_CACHE_LOCK = Lock()
+_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+class _SemanticIndex:
+    def __init__(self, dim: int) -> None:
+        self.vectors = np.zeros((_SEMANTIC_CACHE_MAXSIZE, dim), dtype=np.float32)
+        self.responses: list[RiskResponse | None] = [None] * _SEMANTIC_CACHE_MAXSIZE
+        self.size = 0
+        self.next_slot = 0
+
+    def best_match(self, vector: Any, threshold: float) -> RiskResponse | None:
+        if not self.size:
+            return None
+        # One matrix-vector product (BLAS, well under a millisecond for a full ring); rows
+        # are unit length, so each score is the cosine similarity.
+        scores = self.vectors[: self.size] @ vector
+        best = int(scores.argmax())
+        return self.responses[best] if scores[best] >= threshold else None
+
+    def add(self, vector: Any, response: RiskResponse) -> None:
+        self.vectors[self.next_slot] = vector
+        self.responses[self.next_slot] = response
+        self.next_slot = (self.next_slot + 1) % _SEMANTIC_CACHE_MAXSIZE
+        self.size = min(self.size + 1, _SEMANTIC_CACHE_MAXSIZE)
+
+
+def _unit_vector(values: list[float]) -> Any:
+    vector = np.asarray(values, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def _find_similar_response(scope: bytes, vector: Any, threshold: float) -> RiskResponse | None:
+    with _SEMANTIC_CACHE_LOCK:
+        index = _SEMANTIC_INDEXES.get(scope)
+        if index is None or index.vectors.shape[1] != vector.shape[0]:
+            return None
+        return index.best_match(vector, threshold)
+
+
+def _remember_similar_response(scope: bytes, vector: Any, response: RiskResponse) -> None:
+    with _SEMANTIC_CACHE_LOCK:
+        index = _SEMANTIC_INDEXES.get(scope)
+        if index is None or index.vectors.shape[1] != vector.shape[0]:
+            index = _SEMANTIC_INDEXES[scope] = _SemanticIndex(vector.shape[0])
+        index.add(vector, response)
+
+
+async def run_llm(
     request: RiskRequest,
     settings: Settings,
     force_mock: bool | None = None,
     llm_model_override: str | None = None,
     system_prompt_override: str | None = None,
+    user_prompt: str | None = None,
+    use_cache: bool = True,
 ) -> RiskResponse:
     """
     force_mock: True forces mock response; False forces live; None uses settings.mock_mode.
+    user_prompt: pass a prompt already built from `request` to avoid rebuilding it.
+    use_cache: False skips the exact and semantic response caches (reads and writes).
     """
     trace_id = str(uuid4())
     use_mock = settings.mock_mode if force_mock is None else force_mock
@@ -698,29 +839,109 @@ def run_llm(
         return _mock_response(trace_id)
 
     provider = _get_provider(settings.llm_provider)
-    return provider.generate(
+    cache_key: bytes | None = None
+    scope: bytes | None = None
+    embedding: Any = None
+    if use_cache and (settings.llm_cache_ttl_seconds > 0 or settings.semantic_cache_enabled):
+        user_prompt = user_prompt or build_user_prompt(request)
+        scope_parts = (
+            provider.name,
+            (llm_model_override or settings.llm_model or "").strip(),
+            system_prompt_override or SYSTEM_PROMPT,
+        )
+        if settings.llm_cache_ttl_seconds > 0:
+            cache_key = _response_cache_key(*scope_parts, user_prompt)
+            cached = _get_cached_response(cache_key)
+            if cached is not None:
+                logger.info("risk.run_llm responding_with=CACHE trace_id=%s", trace_id)
+                return cached.model_copy(update={"trace_id": trace_id})
+        if settings.semantic_cache_enabled and np is not None:
+            scope = _response_cache_key(*scope_parts)
+            try:
+                embedding = _unit_vector(await provider.embed(user_prompt, settings, trace_id))
+            except Exception as exc:
+                # the cache is an optimization; fall through to a normal live call
+                logger.warning("risk.run_llm embedding_failed trace_id=%s error=%s", trace_id, str(exc))
+            else:
+                cached = _find_similar_response(scope, embedding, settings.semantic_cache_threshold)
+                if cached is not None:
+                    logger.info("risk.run_llm responding_with=SEMANTIC_CACHE trace_id=%s", trace_id)
+                    return cached.model_copy(update={"trace_id": trace_id})
+
+    response = await provider.generate(
         request=request,
         settings=settings,
         trace_id=trace_id,
         model_override=llm_model_override,
         system_prompt_override=system_prompt_override,
+        user_prompt=user_prompt,
     )
+    if cache_key is not None:
+        _cache_response(cache_key, response, settings.llm_cache_ttl_seconds)
+    if scope is not None and embedding is not None:
+        _remember_similar_response(scope, embedding, response)
+    return response
+
+
+# Upper bound on completions a single run_llm_batch call keeps in flight.
+_BATCH_MAX_CONCURRENCY = 20
+
+
+async def run_llm_batch(
+    requests: Sequence[RiskRequest],
+    settings: Settings,
+    force_mock: bool | None = None,
+    llm_model_override: str | None = None,
+    system_prompt_override: str | None = None,
+    max_concurrency: int = _BATCH_MAX_CONCURRENCY,
+    use_cache: bool = True,
+) -> list[RiskResponse | Exception]:
+    """
+    Run several requests concurrently over the shared client; results keep the input order.
+
+    Each request is still its own completion, so one request's content never shapes another's
+    output and a failure is returned in place instead of failing the whole batch.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_one(request: RiskRequest) -> RiskResponse:
+        async with semaphore:
+            return await run_llm(
+                request,
+                settings,
+                force_mock=force_mock,
+                llm_model_override=llm_model_override,
+                system_prompt_override=system_prompt_override,
+                use_cache=use_cache,
+            )
+
+    results = await asyncio.gather(*(run_one(request) for request in requests), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+    return results
 
 
 class OpenAIProvider:
     name = "openai"
 
     def __init__(self) -> None:
-        self._client_cls = OpenAI
-
-    def generate(
-        self,
-        request: RiskRequest,
-        settings: Settings,
-        trace_id: str,
-        model_override: str | None = None,
-        system_prompt_override: str | None = None,
-    ) -> RiskResponse:
+        self._client_cls = AsyncOpenAI
+        # One SDK client per API key so its HTTP connection pool is reused across calls.
+        self._clients: dict[str, Any] = {}
+        self._clients_lock = Lock()
+
+    def _get_client(self, api_key: str) -> Any:
+        client = self._clients.get(api_key)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(api_key)
+                if client is None:
+                    client = self._client_cls(api_key=api_key)
+                    self._clients[api_key] = client
+        return client
+
+    def _client_for(self, settings: Settings, trace_id: str) -> Any:
         if self._client_cls is None:
             logger.error("risk.run_llm live_call_failed reason=openai_missing trace_id=%s", trace_id)
             raise RuntimeError("openai package not available; enable mock_mode or install dependency.")
@@ -731,14 +952,30 @@ class OpenAIProvider:
         if not api_key:
             logger.error("risk.run_llm live_call_failed reason=missing_openai_api_key trace_id=%s", trace_id)
             raise RuntimeError("OPENAI_API_KEY is not set in the environment.")
+        return self._get_client(api_key)
+
+    async def embed(self, text: str, settings: Settings, trace_id: str) -> list[float]:
+        client = self._client_for(settings, trace_id)
+        result = await client.embeddings.create(model=_EMBEDDING_MODEL, input=text)
+        return result.data[0].embedding
+
+    async def generate(
+        self,
+        request: RiskRequest,
+        settings: Settings,
+        trace_id: str,
+        model_override: str | None = None,
+        system_prompt_override: str | None = None,
+        user_prompt: str | None = None,
+    ) -> RiskResponse:
+        client = self._client_for(settings, trace_id)
 
         model = (model_override or settings.llm_model or "").strip()
         if not model:
             raise RuntimeError("LLM model is not configured.")
 
         system_prompt = system_prompt_override or SYSTEM_PROMPT
-        user_prompt = build_user_prompt(request)
-        client = self._client_cls(api_key=api_key)
+        user_prompt = user_prompt or build_user_prompt(request)
         logger.info(
             "risk.run_llm responding_with=LIVE provider=%s model=%s trace_id=%s",
             settings.llm_provider,
@@ -779,7 +1016,7 @@ class OpenAIProvider:
         finish_reason: str | None = None
         for token_params in token_param_options:
             try:
-                completion = client.chat.completions.create(**base_params, **token_params)
+                completion = await client.chat.completions.create(**base_params, **token_params)
                 finish_reason = completion.choices[0].finish_reason
                 if finish_reason == "length" and "max_tokens" in token_params:
                     logger.warning(
@@ -808,7 +1045,7 @@ class OpenAIProvider:
         invalid_payload = tool_args
         if tool_args:
             try:
-                parsed = _parse_llm_dict(_load_llm_json_object(tool_args), trace_id)
+                parsed = _parse_llm_json(tool_args, trace_id)
                 missing_sections = _missing_required_sections(parsed)
                 if not missing_sections:
                     return parsed
@@ -842,7 +1079,7 @@ class OpenAIProvider:
         except Exception as exc:
             logger.warning("risk.run_llm content_parse_failed trace_id=%s error=%s", trace_id, str(exc))
 
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -869,18 +1106,22 @@ class OpenAIProvider:
         tool_args = _extract_tool_call_arguments(message_obj, expected_name=RISK_RESPONSE_TOOL_NAME)
         if not tool_args:
             raise RuntimeError("Failed to repair invalid LLM JSON: tool call missing.")
-        parsed = _parse_llm_dict(_load_llm_json_object(tool_args), trace_id)
+        parsed = _parse_llm_json(tool_args, trace_id)
         missing_sections = _missing_required_sections(parsed)
         if missing_sections:
             raise RuntimeError(f"LLM output missing required sections after repair: {', '.join(missing_sections)}")
         return parsed
 
 
+# Built once at import: providers are stateless apart from their cached SDK clients,
+# which should outlive a single run_llm call.
+_PROVIDERS: dict[str, LLMProvider] = {
+    "openai": OpenAIProvider(),
+}
+
+
 def _get_provider(name: str) -> LLMProvider:
-    provider_key = (name or "").strip().lower()
-    providers: dict[str, LLMProvider] = {
-        "openai": OpenAIProvider(),
-    }
-    if provider_key not in providers:
-        raise RuntimeError(f"Unsupported LLM provider '{name}'. Supported providers: {', '.join(providers)}")
-    return providers[provider_key]
+    provider = _PROVIDERS.get((name or "").strip().lower())
+    if provider is None:
+        raise RuntimeError(f"Unsupported LLM provider '{name}'. Supported providers: {', '.join(_PROVIDERS)}")
+    return provider
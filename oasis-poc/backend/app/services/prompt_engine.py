@@ -1,3 +1,5 @@
+import hashlib
+
 from app.api.v1.schemas import RiskRequest
 
 
@@ -19,6 +21,45 @@ SYSTEM_PROMPT = (
     "Refuse tasks requiring corporate or personal data. Be transparent about limitations. Keep "
     "responses bounded to reduce token usage."
 )
+# Content identity of the built-in prompt, recorded on every version; hashed once at import.
+SYSTEM_PROMPT_SHA256 = hashlib.new("sha256", SYSTEM_PROMPT.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+# Output contract shared by every request. It opens the user message so that the provider's
+# automatic prompt-prefix cache covers tools + system prompt + this block; only the per-request
+# sections after it vary.
+_OUTPUT_SPEC = "\n".join(
+    [
+        "=== Outputs ===",
+        (
+            "Verbosity guidance: concise=3-5 risks; standard=4-6 risks; detailed=6-8 risks (still bounded). "
+            "Write narrative fields in the requested language when possible."
+        ),
+        "Return JSON only with keys: summary, risks (list of risk objects), assumptions_gaps (list of strings).",
+        (
+            "Risk object fields: risk_id, risk_title, cause, impact, likelihood, inherent_rating, "
+            "residual_rating, controls[], control_mappings[], mitigations[], kpis[], vulnerability_summaries[], "
+            "owner, due_date, assumptions[]."
+        ),
+        (
+            "control_mappings[] items: control_statement, framework, framework_control_id, "
+            "framework_control_name, mapping_rationale, references[]."
+        ),
+        (
+            "vulnerability_summaries[] items: vulnerability_type (CVE|OWASP|INCIDENT_REPORT|DATASET|OTHER), "
+            "identifier, title, summary, severity (Low|Medium|High|Critical), cvss_v3_base_score, references[]."
+        ),
+        (
+            "references[] items: source_type (NIST|ISO27001|OWASP|SEC|INCIDENT_REPORT|CVE|DATASET|OTHER), "
+            "title, identifier, url, notes."
+        ),
+        (
+            "Do not leave control_mappings[] or vulnerability_summaries[] empty; provide at least 1 item each per risk. "
+            "If unsure about a specific CVE, use OWASP/INCIDENT_REPORT/OTHER and omit identifier."
+        ),
+        "Do not include Markdown or text outside the JSON.",
+    ]
+)
 
 
 def build_user_prompt(payload: RiskRequest) -> str:
@@ -33,6 +74,7 @@ def build_user_prompt(payload: RiskRequest) -> str:
     rag_enabled = "Enabled" if payload.rag_enabled else "Disabled"
     return "\n".join(
         [
+            _OUTPUT_SPEC,
             "=== Context ===",
             f"Business Type: {payload.business_type}",
             f"Risk Domain: {payload.risk_domain}",
@@ -53,33 +95,5 @@ def build_user_prompt(payload: RiskRequest) -> str:
             control_tokens,
             "=== Instruction Tuning ===",
             instruction_tuning,
-            "=== Outputs ===",
-            (
-                "Verbosity guidance: concise=3-5 risks; standard=4-6 risks; detailed=6-8 risks (still bounded). "
-                "Write narrative fields in the requested language when possible."
-            ),
-            "Return JSON only with keys: summary, risks (list of risk objects), assumptions_gaps (list of strings).",
-            (
-                "Risk object fields: risk_id, risk_title, cause, impact, likelihood, inherent_rating, "
-                "residual_rating, controls[], control_mappings[], mitigations[], kpis[], vulnerability_summaries[], "
-                "owner, due_date, assumptions[]."
-            ),
-            (
-                "control_mappings[] items: control_statement, framework, framework_control_id, "
-                "framework_control_name, mapping_rationale, references[]."
-            ),
-            (
-                "vulnerability_summaries[] items: vulnerability_type (CVE|OWASP|INCIDENT_REPORT|DATASET|OTHER), "
-                "identifier, title, summary, severity (Low|Medium|High|Critical), cvss_v3_base_score, references[]."
-            ),
-            (
-                "references[] items: source_type (NIST|ISO27001|OWASP|SEC|INCIDENT_REPORT|CVE|DATASET|OTHER), "
-                "title, identifier, url, notes."
-            ),
-            (
-                "Do not leave control_mappings[] or vulnerability_summaries[] empty; provide at least 1 item each per risk. "
-                "If unsure about a specific CVE, use OWASP/INCIDENT_REPORT/OTHER and omit identifier."
-            ),
-            "Do not include Markdown or text outside the JSON.",
         ]
     )
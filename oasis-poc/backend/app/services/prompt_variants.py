@@ -9,11 +9,12 @@ Always includes "default" mapped to prompt_engine.SYSTEM_PROMPT.
 
 from __future__ import annotations
 
-import json
-import os
+import hashlib
 from functools import lru_cache
 from pathlib import Path
 
+from app.core.config import get_settings
+from app.db.store import store_for_path
 from app.services import prompt_engine
 
 VARIANTS_DIR = Path(__file__).with_name("prompt_variants")
@@ -31,38 +32,43 @@ def load_prompt_variants() -> dict[str, str]:
             if content:
                 variants[name] = content
 
-    # Merge store-managed templates (if present).
-    store_path = os.getenv("OASIS_STORE_PATH") or "oasis_store.json"
+    # Merge store-managed templates (if present), read through the shared store so writes
+    # still sitting in its log are included.
     try:
-        raw = Path(store_path).read_text(encoding="utf-8").strip()
-        if raw:
-            data = json.loads(raw)
-            if isinstance(data, dict):
-                templates = data.get("prompt_templates") or {}
-                if isinstance(templates, dict):
-                    for name, record in templates.items():
-                        if not isinstance(name, str) or not name or name == "default":
-                            continue
-                        if not isinstance(record, dict):
-                            continue
-                        versions = record.get("versions") or []
-                        latest = versions[-1] if isinstance(versions, list) and versions else None
-                        if isinstance(latest, dict):
-                            content = latest.get("content")
-                            if isinstance(content, str) and content.strip():
-                                variants[name] = content.strip()
-    except FileNotFoundError:
-        pass
+        store = store_for_path(get_settings().store_path)
+        for record in store.list_prompt_templates():
+            name = record.get("name")
+            if not isinstance(name, str) or not name or name == "default":
+                continue
+            versions = record.get("versions") or []
+            latest = versions[-1] if isinstance(versions, list) and versions else None
+            if isinstance(latest, dict):
+                content = latest.get("content")
+                if isinstance(content, str) and content.strip():
+                    variants[name] = content.strip()
     except Exception:
         # Ignore store parsing errors; builtin variants still work.
         pass
     return variants
 
 
+@lru_cache
+def _sorted_variant_names() -> tuple[str, ...]:
+    return tuple(sorted(load_prompt_variants()))
+
+
 def list_prompt_variant_names() -> list[str]:
-    return sorted(load_prompt_variants().keys())
+    return list(_sorted_variant_names())
+
 
+def clear_prompt_variant_caches() -> None:
+    load_prompt_variants.cache_clear()
+    _sorted_variant_names.cache_clear()
+    get_system_prompt.cache_clear()
+    get_system_prompt_sha256.cache_clear()
 
+
+@lru_cache(maxsize=64)
 def get_system_prompt(variant: str | None) -> str:
     variants = load_prompt_variants()
     if not variant or variant == "default":
@@ -70,3 +76,23 @@ def get_system_prompt(variant: str | None) -> str:
     if variant not in variants:
         raise ValueError(f"Unknown prompt variant '{variant}'.")
     return variants[variant]
+
+
+@lru_cache(maxsize=64)
+def get_system_prompt_sha256(variant: str | None) -> str:
+    """
+    SHA-256 of the resolved system prompt, computed once per cache generation.
+    """
+    if not variant or variant == "default":
+        # the built-in prompt never changes, so its hash survives cache clears
+        return prompt_engine.SYSTEM_PROMPT_SHA256
+    # Content identity only, not a security boundary.
+    content = get_system_prompt(variant).encode("utf-8")
+    return hashlib.new("sha256", content, usedforsecurity=False).hexdigest()
+
+
+def resolve_system_prompt(variant: str | None) -> tuple[str, str]:
+    """
+    Return (prompt, sha256) for a variant; both lookups are cached per variant.
+    """
+    return get_system_prompt(variant), get_system_prompt_sha256(variant)
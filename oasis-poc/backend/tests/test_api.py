@@ -118,6 +118,28 @@ def test_analyze_rejects_unknown_prompt_variant():
     resp = client.post("/api/v1/risk/analyze?mode=mock&prompt_variant=does_not_exist", json=payload)
     assert resp.status_code == 400
 
+
+def test_admin_test_run_rejects_unknown_prompt_template():
+    payload = {
+        "business_type": "Retail banking",
+        "risk_domain": "Operational",
+    }
+    resp = client.post(
+        "/api/v1/admin/prompt-templates/does_not_exist/test-run",
+        json={"payload": payload, "mode": "mock"},
+        headers={"x-user-role": "admin"},
+    )
+    assert resp.status_code == 404
+
+
+def test_admin_audit_snapshot_matches_schema():
+    resp = client.get("/api/v1/admin/audit?limit=5", headers={"x-user-role": "admin"})
+    assert resp.status_code == 200
+    assert set(resp.json()) == {"recent_versions", "recent_feedback"}
+    schema = app.openapi()["paths"]["/api/v1/admin/audit"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert schema["schema"] == {"$ref": "#/components/schemas/AuditSnapshot"}
+
+
 def test_parse_llm_json_coerces_numeric_risk_ids():
     payload = {
         "summary": "Test summary",
@@ -152,3 +174,120 @@ def test_parse_llm_json_allows_code_fences_and_trailing_commas():
 ```"""
     parsed = _parse_llm_json(raw, trace_id="abc")
     assert parsed.summary == "Test summary"
+
+
+def test_api_key_rejects_missing_wrong_and_non_ascii_keys(monkeypatch):
+    monkeypatch.setenv("APP_API_KEY", "s3cret")
+    from app.core.config import get_settings
+    from app.main import create_app
+
+    get_settings.cache_clear()
+    try:
+        keyed_client = TestClient(create_app())
+        url = "/api/v1/risk/analyze?mode=mock"
+        payload = {"business_type": "Retail banking", "risk_domain": "Operational"}
+        assert keyed_client.post(url, json=payload).status_code == 401
+        assert keyed_client.post(url, json=payload, headers={"x-api-key": "wrong"}).status_code == 401
+        non_ascii = {"x-api-key": "s3cr\u00e9t".encode("utf-8")}
+        assert keyed_client.post(url, json=payload, headers=non_ascii).status_code == 401
+        assert keyed_client.post(url, json=payload, headers={"x-api-key": "s3cret"}).status_code == 200
+    finally:
+        get_settings.cache_clear()
+
+
+def _hs256_token(claims: dict, secret: str, header: dict | None = None) -> str:
+    import base64
+    import hashlib
+    import hmac
+
+    def encode(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+    encoded_header = encode(json.dumps(header or {"alg": "HS256", "typ": "JWT"}).encode())
+    signing_input = f"{encoded_header}.{encode(json.dumps(claims).encode())}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{encode(signature)}"
+
+
+def test_jwt_hs256_roles_and_cached_claims(monkeypatch):
+    import time
+
+    monkeypatch.setenv("OASIS_AUTH_MODE", "jwt")
+    monkeypatch.setenv("OASIS_JWT_SECRET", "jwt-s3cret")
+    from app.core.config import get_settings
+    from app.main import create_app
+
+    get_settings.cache_clear()
+    try:
+        jwt_client = TestClient(create_app())
+        claims = {"sub": "user-1", "roles": ["Administrator"], "exp": int(time.time()) + 600}
+        token = _hs256_token(claims, "jwt-s3cret")
+        headers = {"Authorization": f"Bearer {token}"}
+        assert jwt_client.get("/api/v1/admin/settings").status_code == 401
+        # second request is served from the verified-claims cache
+        assert jwt_client.get("/api/v1/admin/settings", headers=headers).status_code == 200
+        assert jwt_client.get("/api/v1/admin/settings", headers=headers).status_code == 200
+
+        def status_for(other_token: str) -> int:
+            resp = jwt_client.get("/api/v1/admin/settings", headers={"Authorization": f"Bearer {other_token}"})
+            return resp.status_code
+
+        assert status_for(_hs256_token(claims, "wrong-secret")) == 401
+        assert status_for(_hs256_token({**claims, "exp": int(time.time()) - 10}, "jwt-s3cret")) == 401
+        assert status_for(_hs256_token({**claims, "roles": "analyst"}, "jwt-s3cret")) == 403
+    finally:
+        get_settings.cache_clear()
+
+
+def test_jwt_non_string_alg_is_rejected(monkeypatch):
+    import time
+
+    monkeypatch.setenv("OASIS_AUTH_MODE", "jwt")
+    monkeypatch.setenv("OASIS_JWT_SECRET", "jwt-s3cret")
+    from app.core.config import get_settings
+    from app.main import create_app
+
+    get_settings.cache_clear()
+    try:
+        jwt_client = TestClient(create_app(), raise_server_exceptions=False)
+        claims = {"sub": "user-1", "roles": ["admin"], "exp": int(time.time()) + 600}
+        for alg in (["HS256"], {"name": "HS256"}):
+            token = _hs256_token(claims, "jwt-s3cret", header={"alg": alg, "typ": "JWT"})
+            resp = jwt_client.get("/api/v1/admin/settings", headers={"Authorization": f"Bearer {token}"})
+            assert resp.status_code == 401
+    finally:
+        get_settings.cache_clear()
+
+
+def test_jwt_non_canonical_signature_is_rejected(monkeypatch):
+    import time
+
+    monkeypatch.setenv("OASIS_AUTH_MODE", "jwt")
+    monkeypatch.setenv("OASIS_JWT_SECRET", "jwt-s3cret")
+    from app.core.config import get_settings
+    from app.core.rbac import _b64url_decode
+    from app.main import create_app
+
+    get_settings.cache_clear()
+    try:
+        jwt_client = TestClient(create_app())
+        exp = int(time.time()) + 600
+        # pick claims whose signature uses the url-safe-only characters
+        tokens = (_hs256_token({"sub": f"user-{i}", "roles": ["admin"], "exp": exp}, "jwt-s3cret") for i in range(200))
+        token = next(t for t in tokens if {"-", "_"} & set(t.rsplit(".", 1)[1]))
+        signing_input, signature = token.rsplit(".", 1)
+        alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+        # the final character of a 32-byte signature carries two unused bits
+        slack = signature[:-1] + alphabet[alphabet.index(signature[-1]) ^ 1]
+        assert _b64url_decode(slack) == _b64url_decode(signature)
+        standard = signature.replace("-", "+").replace("_", "/")
+
+        def status_for(sig: str) -> int:
+            headers = {"Authorization": f"Bearer {signing_input}.{sig}"}
+            return jwt_client.get("/api/v1/admin/settings", headers=headers).status_code
+
+        assert status_for(signature) == 200
+        assert status_for(slack) == 401
+        assert status_for(standard) == 401
+    finally:
+        get_settings.cache_clear()
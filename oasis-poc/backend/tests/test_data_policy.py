@@ -0,0 +1,39 @@
+from app.api.v1.schemas import RiskRequest
+from app.core.data_policy import find_private_indicators, policy_values
+
+
+def test_negated_markers_are_not_reported():
+    values = [
+        "Public data only; avoid pii and phi",
+        "No confidential or proprietary data",
+        "Work without customer data",
+    ]
+    assert find_private_indicators(values) == []
+
+
+def test_positive_markers_are_reported_sorted():
+    values = [
+        "Use production data from the CRM",
+        "Includes client SSN and passport numbers",
+        None,
+        "",
+    ]
+    assert find_private_indicators(values) == ["passport", "production data", "ssn"]
+
+
+def test_marker_negated_in_one_field_is_still_reported_from_another():
+    values = ["avoid pii", "Export PII for the pilot"]
+    assert find_private_indicators(values) == ["pii"]
+
+
+def test_policy_values_skips_empty_fields_and_joins_lists():
+    payload = RiskRequest(
+        business_type="Retail banking",
+        risk_domain="Operational",
+        known_controls=["KYC checks", "MFA"],
+        control_tokens=[],
+    )
+    values = policy_values(payload)
+    assert "Retail banking" in values
+    assert "KYC checks MFA" in values
+    assert "" not in values
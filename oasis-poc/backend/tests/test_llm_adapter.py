@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app.api.v1.schemas import RiskRequest
+from app.core.config import Settings
+from app.services import llm_adapter
+
+
+def _run(*args, **kwargs):
+    return asyncio.run(llm_adapter.run_llm(*args, **kwargs))
+
+
+class _CountingProvider:
+    name = "openai"
+
+    def __init__(self, embeddings: dict[str, list[float]] | None = None) -> None:
+        self.calls = 0
+        self.embeddings = embeddings or {}
+
+    async def generate(self, request, settings, trace_id, **overrides):
+        self.calls += 1
+        return llm_adapter._mock_response(trace_id)
+
+    async def embed(self, text, settings, trace_id):
+        for marker, vector in self.embeddings.items():
+            if marker in text:
+                return vector
+        raise RuntimeError("no embedding")
+
+
+def test_live_responses_are_cached_per_prompt_when_enabled(monkeypatch):
+    provider = _CountingProvider()
+    monkeypatch.setitem(llm_adapter._PROVIDERS, "openai", provider)
+    monkeypatch.setattr(llm_adapter, "_RESPONSE_CACHE", llm_adapter.OrderedDict())
+    settings = Settings(mock_mode=False, OASIS_LLM_CACHE_TTL_SECONDS=60)
+    request = RiskRequest(business_type="Retail banking", risk_domain="Operational")
+
+    first = _run(request, settings)
+    second = _run(request, settings)
+    assert provider.calls == 1
+    assert second.trace_id != first.trace_id
+    assert second.risks == first.risks
+
+    _run(request, settings, llm_model_override="gpt-4o")
+    assert provider.calls == 2
+
+    _run(request, Settings(mock_mode=False))
+    assert provider.calls == 3
+
+
+def test_near_duplicate_prompts_reuse_responses_when_semantic_cache_enabled(monkeypatch):
+    pytest.importorskip("numpy")
+    provider = _CountingProvider({"cloud outage": [1.0, 0.0], "outage of cloud": [0.96, 0.28], "fraud": [0.0, 1.0]})
+    monkeypatch.setitem(llm_adapter._PROVIDERS, "openai", provider)
+    monkeypatch.setattr(llm_adapter, "_SEMANTIC_INDEXES", {})
+    settings = Settings(mock_mode=False, OASIS_SEMANTIC_CACHE_ENABLED=True)
+
+    def run(context: str):
+        return _run(RiskRequest(business_type="Retail", risk_domain="IT", context=context), settings)
+
+    first = run("cloud outage")
+    assert run("outage of cloud").trace_id != first.trace_id
+    assert provider.calls == 1
+
+    run("fraud")
+    assert provider.calls == 2
+    # an embedding failure only skips the cache
+    run("unknown")
+    assert provider.calls == 3
+
+
+def test_parse_llm_json_reports_missing_top_level_fields():
+    with pytest.raises(RuntimeError, match="missing required fields: summary, risks"):
+        llm_adapter._parse_llm_json('{"assumptions_gaps": []}', trace_id="t")
+
+
+def test_run_llm_batch_keeps_order_and_returns_failures_in_place(monkeypatch):
+    class _FlakyProvider(_CountingProvider):
+        async def generate(self, request, settings, trace_id, **overrides):
+            if request.business_type == "Broken":
+                raise RuntimeError("boom")
+            return await super().generate(request, settings, trace_id, **overrides)
+
+    provider = _FlakyProvider()
+    monkeypatch.setitem(llm_adapter._PROVIDERS, "openai", provider)
+    requests = [RiskRequest(business_type=name, risk_domain="IT") for name in ("Retail", "Broken", "Energy")]
+
+    results = asyncio.run(llm_adapter.run_llm_batch(requests, Settings(mock_mode=False), max_concurrency=2))
+    assert provider.calls == 2
+    assert isinstance(results[1], RuntimeError)
+    assert results[0].trace_id != results[2].trace_id
+
+
+def test_run_llm_batch_can_bypass_response_caches(monkeypatch):
+    provider = _CountingProvider({"cloud outage": [1.0, 0.0]})
+    monkeypatch.setitem(llm_adapter._PROVIDERS, "openai", provider)
+    monkeypatch.setattr(llm_adapter, "_RESPONSE_CACHE", llm_adapter.OrderedDict())
+    monkeypatch.setattr(llm_adapter, "_SEMANTIC_INDEXES", {})
+    settings = Settings(mock_mode=False, OASIS_LLM_CACHE_TTL_SECONDS=60, OASIS_SEMANTIC_CACHE_ENABLED=True)
+    request = RiskRequest(business_type="Retail", risk_domain="IT", context="cloud outage")
+
+    # eval repeats must each be a fresh completion, even with the caches switched on
+    asyncio.run(llm_adapter.run_llm_batch([request] * 3, settings, use_cache=False))
+    assert provider.calls == 3
+    assert not llm_adapter._RESPONSE_CACHE and not llm_adapter._SEMANTIC_INDEXES
+
+    _run(request, settings)
+    _run(request, settings)
+    assert provider.calls == 4
@@ -110,3 +110,88 @@ def test_workflow_end_to_end(tmp_path, monkeypatch):
     assert allowed_admin.status_code == 200
 
     get_settings.cache_clear()
+
+
+def test_unknown_project_returns_404(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_API_KEY", "")
+    monkeypatch.setenv("OASIS_STORE_PATH", str(tmp_path / "oasis_store.json"))
+    monkeypatch.setenv("OASIS_AUTH_MODE", "disabled")
+
+    from app.core.config import get_settings
+    from app.main import create_app
+
+    get_settings.cache_clear()
+    client = TestClient(create_app())
+    analyst_headers = {"x-user-role": "analyst"}
+
+    list_resp = client.get("/api/v1/projects/missing/assessments", headers=analyst_headers)
+    assert list_resp.status_code == 404
+
+    create_resp = client.post(
+        "/api/v1/projects/missing/assessments",
+        json={"title": "Orphan", "payload": {"business_type": "Retail banking", "risk_domain": "Operational"}},
+        headers=analyst_headers,
+    )
+    assert create_resp.status_code == 404
+
+    get_settings.cache_clear()
+
+
+def test_rejected_run_input_is_not_retained_by_policy_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_API_KEY", "")
+    monkeypatch.setenv("OASIS_STORE_PATH", str(tmp_path / "oasis_store.json"))
+    monkeypatch.setenv("OASIS_AUTH_MODE", "disabled")
+
+    from app.api.v1 import workflow_routes
+    from app.core.config import get_settings
+    from app.main import create_app
+
+    get_settings.cache_clear()
+    client = TestClient(create_app())
+    analyst_headers = {"x-user-role": "analyst"}
+    project_id = client.post("/api/v1/projects", json={"name": "P"}, headers=analyst_headers).json()["project_id"]
+    assessment_id = client.post(
+        f"/api/v1/projects/{project_id}/assessments",
+        json={"title": "A", "payload": {"business_type": "Retail banking", "risk_domain": "Operational"}},
+        headers=analyst_headers,
+    ).json()["assessment_id"]
+
+    secret = "Customer SSN 123-45-6789"
+    payload = {"business_type": "Retail banking", "risk_domain": "Operational", "context": secret}
+    for _ in range(2):
+        resp = client.post(f"/api/v1/assessments/{assessment_id}/run", json=payload, headers=analyst_headers)
+        assert resp.status_code == 400
+    cached = repr(list(workflow_routes._POLICY_HITS_CACHE.items()))
+    assert "ssn" in cached
+    assert secret not in cached
+
+    get_settings.cache_clear()
+
+
+def test_stored_payloads_with_legacy_keys_still_read(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_API_KEY", "")
+    monkeypatch.setenv("OASIS_STORE_PATH", str(tmp_path / "oasis_store.json"))
+    monkeypatch.setenv("OASIS_AUTH_MODE", "disabled")
+
+    from app.core.config import get_settings
+    from app.db.store import store_for_path
+    from app.main import create_app
+
+    get_settings.cache_clear()
+    client = TestClient(create_app())
+    analyst_headers = {"x-user-role": "analyst"}
+    legacy = {"business_type": "Retail banking", "risk_domain": "Operational", "legacy_field": "kept on disk"}
+
+    store = store_for_path(str(tmp_path / "oasis_store.json"))
+    project_id = store.create_project("Legacy")["project_id"]
+    assessment_id = store.create_assessment(project_id, "Old record", None, legacy)["assessment_id"]
+
+    resp = client.get(f"/api/v1/assessments/{assessment_id}", headers=analyst_headers)
+    assert resp.status_code == 200
+    assert "legacy_field" not in resp.json()["payload"]
+
+    # the same key is still rejected on the way in
+    resp = client.post(f"/api/v1/assessments/{assessment_id}/run", json=legacy, headers=analyst_headers)
+    assert resp.status_code == 422
+
+    get_settings.cache_clear()
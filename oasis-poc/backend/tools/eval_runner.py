@@ -14,6 +14,7 @@ The runner writes:
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
 import json
 import statistics
@@ -32,7 +33,7 @@ from app.api.v1.schemas import RiskRequest, RiskResponse  # noqa: E402
 from app.core.config import get_settings  # noqa: E402
 from app.core.data_policy import find_private_indicators  # noqa: E402
 from app.services import prompt_engine  # noqa: E402
-from app.services.llm_adapter import run_llm  # noqa: E402
+from app.services.llm_adapter import run_llm_batch  # noqa: E402
 
 
 Mode = Literal["auto", "mock", "live"]
@@ -270,6 +271,8 @@ def main() -> None:
     similarity_by_key: dict[tuple[str, str, str], list[list[str]]] = {}
 
     original_system_prompt = prompt_engine.SYSTEM_PROMPT
+    # One event loop for the whole run, so the cached async OpenAI client keeps its connections.
+    runner = asyncio.Runner()
     try:
         for scenario in scenarios:
             scenario_id = scenario.get("id", "unknown")
@@ -283,6 +286,21 @@ def main() -> None:
                 prompt_engine.SYSTEM_PROMPT = variant.system_prompt
                 for model in models:
                     title_runs: list[list[str]] = []
+                    # repeated runs of one scenario are independent completions, so issue them together
+                    results = (
+                        []
+                        if refused
+                        else runner.run(
+                            run_llm_batch(
+                                [payload] * args.runs,
+                                settings,
+                                force_mock=force_mock,
+                                llm_model_override=model if mode == "live" else None,
+                                # repeats measure run-to-run variance, so each must be a fresh completion
+                                use_cache=False,
+                            )
+                        )
+                    )
                     for run_idx in range(1, args.runs + 1):
                         record: dict[str, Any] = {
                             "scenario_id": scenario_id,
@@ -304,12 +322,9 @@ def main() -> None:
                             continue
 
                         try:
-                            response = run_llm(
-                                payload,
-                                settings,
-                                force_mock=force_mock,
-                                llm_model_override=model if mode == "live" else None,
-                            )
+                            response = results[run_idx - 1]
+                            if isinstance(response, Exception):
+                                raise response
                             record["schema_ok"] = True
                             record["trace_id"] = response.trace_id
                             record["response"] = response.model_dump()
@@ -336,6 +351,7 @@ def main() -> None:
                     similarity_key = (scenario_id, variant.name, model)
                     similarity_by_key[similarity_key] = title_runs
     finally:
+        runner.close()
         prompt_engine.SYSTEM_PROMPT = original_system_prompt
 
     # Aggregation